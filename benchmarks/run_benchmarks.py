@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+import sklearn
+
+# Benchmarks run from the repository root: python -m benchmarks.run_benchmarks
+from benchmarks.synthetic_data import generate_incidents
+from data_io import read_frame, write_frame
+from main import load_dataset_from_azure
+from pipeline.pipeline_builder import PipelineBuilder
+from train import build_model, split_features_target
+
+STEPS = ['CleanDataStep', 'FeatureEngineeringStep', 'CategoricalEncodeStep', 'NormalisationStep']
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+# Modules whose cold import time bounds the start-up of the preprocess component and scoring
+IMPORT_MODULES = ['pipeline', 'pipeline.pipeline_builder', 'main', 'model_artifact', 'deployment.score_server']
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def time_call(fn, repeat: int):
+    """
+    Best-of-``repeat`` wall time of ``fn()``; returns ``(seconds, result)``.
+    """
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark_imports(repeat: int) -> list:
+    """
+    Best-of-``repeat`` cold import time of each of IMPORT_MODULES, each in a
+    fresh interpreter.
+    """
+    results = []
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for module in IMPORT_MODULES:
+        code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+        seconds = min(
+            float(subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True,
+                                 check=True).stdout)
+            for _ in range(repeat)
+        )
+        results.append({'benchmark': f'import.{module}', 'rows': 0, 'seconds': round(seconds, 6), 'rows_per_s': None})
+        print(f"  {'import.' + module:<40}{seconds:>10.3f}s")
+    return results
+
+
+def benchmark_scale(n_rows: int, repeat: int, train_max_rows: int, n_jobs: int = -1) -> list:
+    results = []
+
+    def add(name, seconds, rows):
+        results.append({
+            'benchmark': name,
+            'rows': n_rows,
+            'seconds': round(seconds, 6),
+            'rows_per_s': round(rows / seconds, 1) if seconds else None,
+        })
+        print(f"  {name:<40}{seconds:>10.3f}s")
+
+    raw = generate_incidents(n_rows)
+
+    # Each step on the output of the steps before it
+    data = raw
+    for step_name in STEPS:
+        step = PipelineBuilder([step_name]).load_step(step_name)
+        step.log_level = 'quiet'
+        upstream = data
+        seconds, data = time_call(lambda: step.fit_transform(upstream.copy()), repeat)
+        add(f'step.{step_name}', seconds, len(upstream))
+
+    # The whole pipeline, fitted and then applied again
+    pipeline = PipelineBuilder(STEPS, log_level='quiet').build_pipeline()
+    seconds, processed = time_call(lambda: pipeline.fit_transform(raw.copy()), repeat)
+    add('pipeline.fit_transform', seconds, n_rows)
+    seconds, _ = time_call(lambda: pipeline.transform(raw.copy()), repeat)
+    add('pipeline.transform', seconds, n_rows)
+
+    # Raw CSV load as done by main.py, and the processed hand-off formats
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = os.path.join(tmp, 'raw.csv')
+        raw.to_csv(raw_path, index=False)
+        seconds, _ = time_call(lambda: load_dataset_from_azure(raw_path), repeat)
+        add('main.load_dataset_csv', seconds, n_rows)
+
+        for fmt in ('csv', 'parquet'):
+            out_path = os.path.join(tmp, f'processed.{fmt}')
+            seconds, _ = time_call(lambda: write_frame(processed, out_path, fmt=fmt), repeat)
+            add(f'io.write_{fmt}', seconds, len(processed))
+            seconds, _ = time_call(lambda: read_frame(out_path), repeat)
+            add(f'io.read_{fmt}', seconds, len(processed))
+
+    # train.py model fitting and prediction, on at most train_max_rows rows and
+    # with the n_jobs train.py runs with
+    train_data = processed.iloc[:train_max_rows]
+    X, y = split_features_target(train_data)
+    model = build_model(n_jobs=n_jobs)
+    seconds, _ = time_call(lambda: model.fit(X, y), 1)
+    add('train.fit', seconds, len(X))
+    seconds, _ = time_call(lambda: model.predict(X), repeat)
+    add('train.predict', seconds, len(X))
+
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit or None,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'scikit-learn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results: list, baseline: list, threshold: float, min_seconds: float = 0.0) -> list:
+    """
+    Benchmarks at least ``threshold`` (as a fraction) slower than the baseline,
+    ignoring those that took under ``min_seconds`` in the baseline (timer noise).
+    """
+    baseline_seconds = {(r['benchmark'], r['rows']): r['seconds'] for r in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline_seconds.get((result['benchmark'], result['rows']))
+        if previous and previous >= min_seconds and result['seconds'] > previous * (1 + threshold):
+            regressions.append({**result, 'baseline_seconds': previous, 'slowdown': round(result['seconds'] / previous, 3)})
+    return regressions
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark the preprocessing pipeline and training on synthetic data')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS,
+                        help='Dataset sizes to benchmark (e.g. 10000 100000 1000000 10000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per benchmark; the best time is kept')
+    parser.add_argument('--train-max-rows', type=int, default=100_000,
+                        help='Cap on the rows used for the RandomForest fit/predict benchmarks')
+    parser.add_argument('--n-jobs', type=int, default=-1,
+                        help='Cores used to fit and predict trees, as train.py --n_jobs (-1 for all)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Results JSON path (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--baseline', type=str, default=None, help='Earlier results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Slowdown versus the baseline (fraction) reported as a regression')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='Baseline timings below this are too noisy to flag as regressions')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    print("Benchmarking imports...")
+    results = benchmark_imports(args.repeat)
+    for n_rows in args.rows:
+        print(f"Benchmarking {n_rows} rows...")
+        results.extend(benchmark_scale(n_rows, args.repeat, args.train_max_rows, args.n_jobs))
+
+    report = {'environment': environment(), 'results': results}
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.threshold, args.min_seconds)
+        report['baseline'] = args.baseline
+        report['regressions'] = regressions
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']} @ {regression['rows']} rows: "
+                  f"{regression['baseline_seconds']:.3f}s -> {regression['seconds']:.3f}s")
+
+    out_path = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved benchmark results to {out_path}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+# Column order of the itsm-data extract
+COLUMNS = [
+    "CI_Name", "CI_Cat", "CI_Subcat", "WBS", "Incident_ID", "Status", "Impact", "Urgency", "Priority",
+    "number_cnt", "Category", "KB_number", "Alert_Status", "No_of_Reassignments", "Open_Time", "Reopen_Time",
+    "Resolved_Time", "Close_Time", "Handle_Time_hrs", "Closure_Code", "No_of_Related_Interactions",
+    "Related_Interaction", "No_of_Related_Incidents", "No_of_Related_Changes", "Related_Change",
+]
+
+CI_CATS = ["application", "subapplication", "computer", "storage", "hardware", "database", "displaydevice",
+           "officeelectronics", "networkcomponents", "software", "applicationcomponent", "Phone"]
+CI_SUBCATS = ["Web Based Application", "Desktop Application", "Server Based Application", "SAP", "Client Based Application",
+              "Linux Server", "Windows Server", "Laptop", "Desktop", "Banking Device", "Database", "Monitor",
+              "Printer", "Network Component", "Encryption", "Citrix", "Omgeving", "Keyboard"]
+CLOSURE_CODES = ["Other", "Software", "User error", "No error - works as designed", "Operator error", "Data",
+                 "User manual not used", "Unknown", "Hardware", "Inquiry", "Referred", "Questions"]
+CATEGORIES = ["incident", "request for information", "complaint", "Request for change"]
+STATUSES = ["Closed", "Work in progress"]
+
+# Date formats seen in the extracts, with their share of rows; the last one
+# is only handled by the parser's coerce fallback.
+TIME_FORMATS = ["%d/%m/%Y %H:%M", "%d-%m-%Y %H:%M", "%m/%d/%Y %H:%M", "%Y-%m-%d %H:%M:%S"]
+TIME_FORMAT_SHARES = [0.6, 0.2, 0.15, 0.05]
+
+# Distinct timestamps/handle times are drawn from pools so generating tens of
+# millions of rows does not mean formatting tens of millions of strings.
+POOL_SIZE = 100_000
+
+
+def _choice(rng, values, n, missing=0.0):
+    column = np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+    if missing:
+        column[rng.random(n) < missing] = np.nan
+    return column
+
+
+def _codes(rng, prefix, cardinality, width, n, missing=0.0):
+    pool = np.array([f"{prefix}{i:0{width}d}" for i in range(cardinality)], dtype=object)
+    return _choice(rng, pool, n, missing)
+
+
+def _time_pool(rng):
+    minutes = np.sort(rng.integers(0, 3 * 365 * 24 * 60, POOL_SIZE))
+    timestamps = pd.Timestamp("2012-01-01") + pd.to_timedelta(minutes, unit="m")
+    formats = rng.choice(len(TIME_FORMATS), POOL_SIZE, p=TIME_FORMAT_SHARES)
+    strings = np.empty(POOL_SIZE, dtype=object)
+    for i, fmt in enumerate(TIME_FORMATS):
+        mask = formats == i
+        strings[mask] = timestamps[mask].strftime(fmt)
+    return strings
+
+
+def generate_incidents(n_rows: int, seed: int = 0, id_offset: int = 0) -> pd.DataFrame:
+    """
+    Generate ``n_rows`` synthetic ITSM incidents with the columns, value
+    formats and missing-value patterns of the itsm-data asset.
+    """
+    rng = np.random.default_rng(seed)
+    n = n_rows
+
+    time_pool = _time_pool(rng)
+    open_idx = rng.integers(0, POOL_SIZE, n)
+    resolved_idx = np.minimum(open_idx + rng.integers(0, 2000, n), POOL_SIZE - 1)
+    close_idx = np.minimum(resolved_idx + rng.integers(0, 500, n), POOL_SIZE - 1)
+
+    hours_pool = np.array([f"{hours:,.3f}" for hours in rng.exponential(400.0, POOL_SIZE)], dtype=object)
+    handle_time = hours_pool[rng.integers(0, POOL_SIZE, n)]
+    handle_time[rng.random(n) < 0.03] = np.nan
+
+    reopen_time = np.full(n, np.nan, dtype=object)
+    reopened = rng.random(n) < 0.05
+    reopen_time[reopened] = time_pool[close_idx[reopened]]
+
+    impact = rng.integers(1, 6, n)
+    urgency = rng.integers(1, 6, n)
+    priority = np.clip(np.ceil((impact + urgency) / 2), 1, 5)
+    priority[rng.random(n) < 0.02] = np.nan
+
+    data = {
+        "CI_Name": _codes(rng, "SUB", 3000, 6, n),
+        "CI_Cat": _choice(rng, CI_CATS, n, missing=0.01),
+        "CI_Subcat": _choice(rng, CI_SUBCATS, n, missing=0.01),
+        "WBS": _codes(rng, "WBS", 300, 6, n),
+        "Incident_ID": pd.Series(np.arange(id_offset, id_offset + n)).map("IM{:07d}".format).to_numpy(dtype=object),
+        "Status": _choice(rng, STATUSES, n),
+        "Impact": impact.astype(str).astype(object),
+        "Urgency": urgency.astype(str).astype(object),
+        "Priority": priority,
+        "number_cnt": rng.random(n),
+        "Category": _choice(rng, CATEGORIES, n),
+        "KB_number": _codes(rng, "KM", 1800, 7, n),
+        "Alert_Status": np.full(n, "closed", dtype=object),
+        "No_of_Reassignments": rng.poisson(1.5, n).astype(float),
+        "Open_Time": time_pool[open_idx],
+        "Reopen_Time": reopen_time,
+        "Resolved_Time": time_pool[resolved_idx],
+        "Close_Time": time_pool[close_idx],
+        "Handle_Time_hrs": handle_time,
+        "Closure_Code": _choice(rng, CLOSURE_CODES, n, missing=0.01),
+        "No_of_Related_Interactions": rng.integers(1, 4, n).astype(float),
+        "Related_Interaction": _codes(rng, "SD", 100000, 7, n),
+        "No_of_Related_Incidents": np.where(rng.random(n) < 0.98, np.nan, rng.integers(1, 5, n)),
+        "No_of_Related_Changes": np.where(rng.random(n) < 0.99, np.nan, 1.0),
+        "Related_Change": _choice(rng, [np.nan] * 99 + ["C00003000"], n),
+    }
+    data["No_of_Reassignments"][rng.random(n) < 0.01] = np.nan
+    data["No_of_Related_Interactions"][rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def write_incidents_csv(path: str, n_rows: int, seed: int = 0, chunk_size: int = 1_000_000):
+    """
+    Write ``n_rows`` synthetic incidents to a CSV, one chunk at a time so
+    datasets larger than memory can be produced.
+    """
+    for chunk_number, start in enumerate(range(0, n_rows, chunk_size)):
+        chunk = generate_incidents(min(chunk_size, n_rows - start), seed=seed + chunk_number, id_offset=start)
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic ITSM incident CSV")
+    parser.add_argument("--rows", type=int, required=True, help="Number of incidents to generate")
+    parser.add_argument("--output", type=str, required=True, help="CSV path to write")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_incidents_csv(args.output, args.rows, seed=args.seed)
+    print(f"Wrote {args.rows} synthetic incidents to {args.output}")
@@ -0,0 +1,152 @@
+import os
+import pandas as pd
+
+# Formats the preprocess component can hand to the train and test components
+FORMATS = ('csv', 'parquet', 'feather')
+
+DEFAULT_COMPRESSION = {
+    'csv': None,
+    'parquet': 'snappy',
+    'feather': 'lz4',
+}
+
+# Output paths provided by Azure ML carry no extension, so formats are told
+# apart by the magic bytes at the start of the file.
+_PARQUET_MAGIC = b'PAR1'
+_FEATHER_MAGIC = b'ARROW1'
+
+
+def detect_format(path: str) -> str:
+    """
+    Detect whether a file is Parquet, Feather (Arrow IPC) or CSV.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(len(_FEATHER_MAGIC))
+    if head.startswith(_PARQUET_MAGIC):
+        return 'parquet'
+    if head == _FEATHER_MAGIC:
+        return 'feather'
+    return 'csv'
+
+
+def read_frame(path: str, columns: list = None) -> pd.DataFrame:
+    """
+    Read a processed dataset in any of the supported formats, memory mapping
+    columnar files so uncompressed data is not copied on load.
+    """
+    fmt = detect_format(path)
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+    if fmt == 'feather':
+        import pyarrow.feather as feather
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_frame_chunks(path: str, chunk_size: int, columns: list = None):
+    """
+    Read a processed dataset in any of the supported formats as DataFrames of
+    at most ``chunk_size`` rows, so it never has to fit in memory at once.
+    """
+    fmt = detect_format(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == 'feather':
+        import pyarrow as pa
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+            if columns is not None:
+                table = table.select(columns)
+            # Memory mapped, so only the slice being converted is materialised
+            for start in range(0, table.num_rows, chunk_size):
+                yield table.slice(start, chunk_size).to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+
+def write_frame(df: pd.DataFrame, path: str, fmt: str = 'csv', compression: str = 'default'):
+    """
+    Write a whole DataFrame in the given format.
+    """
+    with FrameWriter(path, fmt=fmt, compression=compression) as writer:
+        writer.write(df)
+
+
+class FrameWriter:
+    """
+    Writes a dataset to a single file one chunk at a time. The first chunk
+    fixes the columns (and, for columnar formats, the schema) of the file.
+    Closed without any writes, the file is still created, empty, with the
+    columns and dtypes of ``template`` (a frame; no columns without one).
+
+    ``compression='default'`` picks the format's usual codec; None disables it.
+    CSV is always written uncompressed so it stays readable by older jobs.
+    """
+
+    def __init__(self, path: str, fmt: str = 'csv', compression: str = 'default', template: pd.DataFrame = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}', expected one of {FORMATS}")
+        self.path = path
+        self.fmt = fmt
+        if compression == 'default':
+            compression = DEFAULT_COMPRESSION[fmt]
+        self.compression = None if compression in (None, 'none') else compression
+        self.columns = None
+        self.template = None if template is None else template.iloc[:0]
+        self._schema = None
+        self._writer = None
+
+    def write(self, df: pd.DataFrame):
+        if self.columns is None:
+            self._open(df)
+        else:
+            df = df.reindex(columns=self.columns)
+
+        if self.fmt == 'csv':
+            df.to_csv(self.path, mode='a', header=False, index=False)
+        else:
+            import pyarrow as pa
+            self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+
+    def _open(self, df: pd.DataFrame):
+        # Ensure parent directories exist (Azure may provide a file path).
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.columns = df.columns
+        self.template = df.iloc[:0]
+
+        if self.fmt == 'csv':
+            df.iloc[:0].to_csv(self.path, index=False)
+            return
+
+        import pyarrow as pa
+        self._schema = pa.Schema.from_pandas(df, preserve_index=False)
+        if self.fmt == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression=self.compression or 'none')
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = pa.ipc.new_file(self.path, self._schema, options=options)
+
+    def close(self):
+        if self.columns is None:
+            self._open(self.template if self.template is not None else pd.DataFrame())
+        self._close_writer()
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # A failed run leaves no empty file standing in for its output
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_writer()
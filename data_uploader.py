@@ -1,34 +1,335 @@
-# Imports
-from azure.ai.ml import MLClient
-from azure.ai.ml.entities import Data
-from azure.ai.ml.constants import AssetTypes
-from azure.identity import DefaultAzureCredential
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BLOCK_SIZE = 8 * 1024 ** 2
+
+
+class StorageBackend(ABC):
+    """
+    Where dataset files are uploaded to and registered. Files are uploaded
+    as blocks staged against a blob name and then committed in order;
+    blocks staged by an interrupted upload stay visible through
+    ``staged_blocks`` so the next attempt can skip them.
+    """
+
+    @abstractmethod
+    def latest_version(self, name: str):
+        """
+        ``{'version': str, 'tags': dict}`` of the latest registered version, or None
+        """
+
+    @abstractmethod
+    def versions(self, name: str) -> list:
+        """
+        Every registered version of dataset ``name``
+        """
+
+    @abstractmethod
+    def blob_exists(self, blob_name: str) -> bool:
+        """
+        Whether ``blob_name`` has already been committed
+        """
+
+    @abstractmethod
+    def staged_blocks(self, blob_name: str) -> set:
+        """
+        IDs of the blocks staged (but not yet committed) for ``blob_name``
+        """
+
+    @abstractmethod
+    def stage_block(self, blob_name: str, block_id: str, data: bytes):
+        """
+        Upload one block of ``blob_name``
+        """
+
+    @abstractmethod
+    def commit_blocks(self, blob_name: str, block_ids: list):
+        """
+        Assemble the staged blocks, in the given order, into ``blob_name``
+        """
+
+    @abstractmethod
+    def register(self, name: str, version: str, blob_name: str, description: str, tags: dict):
+        """
+        Register ``blob_name`` as version ``version`` of dataset ``name``
+        """
+
+
+class LocalDirectoryStorage(StorageBackend):
+    """
+    Storage in a local directory, a stand-in for the Azure ML workspace.
+    Registered versions are laid out as ``root/<name>/<version>/<file>``,
+    the layout dataset_cache.LocalBackend reads.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, '.blobs')
+        self.staging_dir = os.path.join(root, '.staging')
+        self.registry_dir = os.path.join(root, '.registry')
+
+    def latest_version(self, name: str):
+        versions = self.versions(name)
+        if not versions:
+            return None
+        version = max(versions, key=lambda v: (v.isdigit(), int(v) if v.isdigit() else 0, v))
+        with open(os.path.join(self.registry_dir, name, f'{version}.json')) as f:
+            return json.load(f)
+
+    def versions(self, name: str) -> list:
+        registry = os.path.join(self.registry_dir, name)
+        if not os.path.isdir(registry):
+            return []
+        return [file_name[:-len('.json')] for file_name in os.listdir(registry) if file_name.endswith('.json')]
+
+    def blob_exists(self, blob_name: str) -> bool:
+        return os.path.exists(os.path.join(self.blob_dir, blob_name))
+
+    def staged_blocks(self, blob_name: str) -> set:
+        staging = os.path.join(self.staging_dir, blob_name)
+        if not os.path.isdir(staging):
+            return set()
+        return {block_id for block_id in os.listdir(staging) if not block_id.endswith('.tmp')}
+
+    def stage_block(self, blob_name: str, block_id: str, data: bytes):
+        staging = os.path.join(self.staging_dir, blob_name)
+        os.makedirs(staging, exist_ok=True)
+        # Write then rename, so a block cut off mid-write is never seen as staged
+        path = os.path.join(staging, block_id)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+
+    def commit_blocks(self, blob_name: str, block_ids: list):
+        staging = os.path.join(self.staging_dir, blob_name)
+        path = os.path.join(self.blob_dir, blob_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.partial', 'wb') as out:
+            for block_id in block_ids:
+                with open(os.path.join(staging, block_id), 'rb') as block:
+                    shutil.copyfileobj(block, out)
+        os.replace(path + '.partial', path)
+        shutil.rmtree(staging, ignore_errors=True)
+        # Drop the now empty parent folders of the staged blob
+        parent = os.path.dirname(staging)
+        while parent != self.staging_dir and os.path.isdir(parent) and not os.listdir(parent):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+    def register(self, name: str, version: str, blob_name: str, description: str, tags: dict):
+        version_dir = os.path.join(self.root, name, version)
+        os.makedirs(version_dir, exist_ok=True)
+        target = os.path.join(version_dir, os.path.basename(blob_name))
+        try:
+            # Versions share the committed blob rather than copying it
+            os.link(os.path.join(self.blob_dir, blob_name), target)
+        except OSError:
+            shutil.copyfile(os.path.join(self.blob_dir, blob_name), target)
+
+        registry = os.path.join(self.registry_dir, name)
+        os.makedirs(registry, exist_ok=True)
+        with open(os.path.join(registry, f'{version}.json'), 'w') as f:
+            json.dump({'version': version, 'path': target, 'description': description, 'tags': tags}, f, indent=2)
+
+
+class AzureMLStorage(StorageBackend):
+    """
+    Blocks are staged in the workspace's default datastore (a blob
+    container) and committed versions registered as URI_FILE data assets.
+    """
 
-class AzureUploader:
     def __init__(self, subscription_id: str, resource_group_name: str, workspace_name: str):
+        from azure.ai.ml import MLClient
+        from azure.identity import DefaultAzureCredential
+        from azure.storage.blob import BlobServiceClient
+
+        credential = DefaultAzureCredential()
         self.ml_client = MLClient(
-            DefaultAzureCredential(),
+            credential,
             subscription_id=subscription_id,
             resource_group_name=resource_group_name,
             workspace_name=workspace_name,
         )
+        self.datastore = self.ml_client.datastores.get_default()
+        account_url = f"https://{self.datastore.account_name}.blob.{self.datastore.endpoint}"
+        self.container = BlobServiceClient(account_url, credential=credential).get_container_client(
+            self.datastore.container_name
+        )
+
+    def latest_version(self, name: str):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        # Only the latest version is fetched, rather than listing every one
+        try:
+            asset = self.ml_client.data.get(name=name, label='latest')
+        except ResourceNotFoundError:
+            return None
+        return {'version': str(asset.version), 'tags': dict(asset.tags or {})}
+
+    def versions(self, name: str) -> list:
+        return [str(asset.version) for asset in self.ml_client.data.list(name=name)]
 
-    def upload_dataset(self, dataset_name: str, dataset_path: str, description: str):
-        # Check if the dataset already exists
-        existing_datasets = self.ml_client.data.list(name=dataset_name)
-        
-        # Determine the next version number
-        version_numbers = [int(ds.version) for ds in existing_datasets if ds.version.isdigit()]
-        next_version = max(version_numbers, default=0) + 1
+    def blob_exists(self, blob_name: str) -> bool:
+        return self.container.get_blob_client(blob_name).exists()
+
+    def staged_blocks(self, blob_name: str) -> set:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            _, uncommitted = self.container.get_blob_client(blob_name).get_block_list('uncommitted')
+        except ResourceNotFoundError:
+            return set()
+        return {block.id for block in uncommitted}
+
+    def stage_block(self, blob_name: str, block_id: str, data: bytes):
+        self.container.get_blob_client(blob_name).stage_block(block_id, data, length=len(data))
+
+    def commit_blocks(self, blob_name: str, block_ids: list):
+        from azure.storage.blob import BlobBlock
+
+        self.container.get_blob_client(blob_name).commit_block_list([BlobBlock(block_id) for block_id in block_ids])
+
+    def register(self, name: str, version: str, blob_name: str, description: str, tags: dict):
+        from azure.ai.ml.constants import AssetTypes
+        from azure.ai.ml.entities import Data
 
-        # Define and register the new dataset version
         new_data = Data(
-            name=dataset_name,
-            version=str(next_version),
-            path=dataset_path,
+            name=name,
+            version=version,
+            path=f"azureml://datastores/{self.datastore.name}/paths/{blob_name}",
             type=AssetTypes.URI_FILE,
             description=description,
+            tags=tags,
         )
-
         self.ml_client.data.create_or_update(new_data)
-        print(f"Uploaded dataset '{dataset_name}' as version {next_version}.")
+
+
+class AzureUploader:
+    """
+    Uploads a dataset file and registers it as the next version of a
+    dataset, unless its content matches the latest registered version.
+
+    The file is hashed in ``block_size`` blocks, and uploaded as those
+    blocks ``max_concurrency`` at a time. Block IDs carry their index and
+    checksum and the blob is named by the file's checksum, so rerunning an
+    interrupted upload of the same file only sends the missing blocks.
+    """
+
+    def __init__(self, subscription_id: str = None, resource_group_name: str = None, workspace_name: str = None,
+                 storage: StorageBackend = None, block_size: int = DEFAULT_BLOCK_SIZE, max_concurrency: int = 8,
+                 max_retries: int = 3, backoff: float = 0.5):
+        self.storage = storage or AzureMLStorage(subscription_id, resource_group_name, workspace_name)
+        self.block_size = block_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def hash_file(self, dataset_path: str):
+        """
+        SHA-256 of the whole file and of each of its blocks, in one pass.
+        """
+        digest, block_digests = hashlib.sha256(), []
+        with open(dataset_path, 'rb') as f:
+            for block in iter(lambda: f.read(self.block_size), b''):
+                digest.update(block)
+                block_digests.append(hashlib.sha256(block).hexdigest())
+        return digest.hexdigest(), block_digests
+
+    def upload_dataset(self, dataset_name: str, dataset_path: str, description: str) -> str:
+        """
+        Upload and register ``dataset_path``, returning the registered version
+        (the latest existing one if the content is unchanged).
+        """
+        start = time.perf_counter()
+        digest, block_digests = self.hash_file(dataset_path)
+        size = os.path.getsize(dataset_path)
+
+        latest = self.storage.latest_version(dataset_name)
+        if latest is not None and latest['tags'].get('sha256') == digest:
+            print(f"Dataset '{dataset_name}' is unchanged since version {latest['version']}; skipping upload.")
+            return latest['version']
+
+        blob_name = f"{dataset_name}/{digest}/{os.path.basename(dataset_path)}"
+        if self.storage.blob_exists(blob_name):
+            print(f"File already uploaded as '{blob_name}'.")
+        else:
+            self._upload_blocks(dataset_path, blob_name, block_digests)
+
+        next_version = self._next_version(dataset_name)
+        tags = {'sha256': digest, 'size_bytes': str(size)}
+        self.storage.register(dataset_name, next_version, blob_name, description, tags)
+        print(f"Uploaded dataset '{dataset_name}' as version {next_version} in {time.perf_counter() - start:.2f}s.")
+        return next_version
+
+    def _next_version(self, dataset_name: str) -> str:
+        # Continue after the highest numbered version: the 'latest' label can
+        # point at an older or named version, which would collide or sort below
+        numbers = [int(version) for version in self.storage.versions(dataset_name) if version.isdigit()]
+        return str(max(numbers, default=0) + 1)
+
+    def _upload_blocks(self, dataset_path: str, blob_name: str, block_digests: list):
+        # Fixed-width IDs: Azure requires every block ID of a blob to have the same length
+        block_ids = [f'{index:06d}-{block_digest[:32]}' for index, block_digest in enumerate(block_digests)]
+        staged = self.storage.staged_blocks(blob_name)
+        pending = [index for index, block_id in enumerate(block_ids) if block_id not in staged]
+        if len(pending) < len(block_ids):
+            print(f"Resuming upload: {len(block_ids) - len(pending)} of {len(block_ids)} blocks already staged.")
+
+        def upload(index):
+            # Each worker reads its own block, so only max_concurrency blocks are in memory
+            with open(dataset_path, 'rb') as f:
+                f.seek(index * self.block_size)
+                data = f.read(self.block_size)
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.storage.stage_block(blob_name, block_ids[index], data)
+                    return
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                    print(f"Block {index} failed ({e}); retrying in {delay:.2f}s")
+                    time.sleep(delay)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            list(pool.map(upload, pending))
+        self.storage.commit_blocks(blob_name, block_ids)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Upload a dataset file to Azure ML as a new version')
+    parser.add_argument('--dataset-name', type=str, required=True, help='Name of the dataset asset')
+    parser.add_argument('--data-path', type=str, required=True, help='Local file to upload')
+    parser.add_argument('--description', type=str, default='', help='Description of the new version')
+    parser.add_argument('--storage-dir', type=str, default=None,
+                        help='Upload to this local directory instead of Azure ML')
+    parser.add_argument('--block-size-mb', type=int, default=DEFAULT_BLOCK_SIZE // 1024 ** 2,
+                        help='Size of the blocks the file is hashed and uploaded in')
+    parser.add_argument('--max-concurrency', type=int, default=8, help='Blocks uploaded in parallel')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    if args.storage_dir:
+        storage = LocalDirectoryStorage(args.storage_dir)
+    else:
+        storage = AzureMLStorage(
+            subscription_id=os.environ.get("AZURE_SUBSCRIPTION_ID", "your_subscription_id"),
+            resource_group_name=os.environ.get("AZURE_RESOURCE_GROUP", "your_resource_group_name"),
+            workspace_name=os.environ.get("AZURE_WORKSPACE_NAME", "your_workspace_name"),
+        )
+    uploader = AzureUploader(storage=storage, block_size=args.block_size_mb * 1024 ** 2,
+                             max_concurrency=args.max_concurrency)
+    uploader.upload_dataset(args.dataset_name, args.data_path, args.description)
+
+
+if __name__ == '__main__':
+    main()
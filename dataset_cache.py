@@ -0,0 +1,324 @@
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST_FILENAME = 'manifest.json'
+_HASH_BLOCK_SIZE = 8 * 1024 ** 2
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _list_local_files(base: str) -> dict:
+    files = {}
+    for root, _, names in os.walk(base):
+        for file_name in names:
+            path = os.path.join(root, file_name)
+            files[os.path.relpath(path, base)] = os.path.getsize(path)
+    return files
+
+
+class DatasetBackend(ABC):
+    """
+    Where dataset assets live. A dataset version is one file or a folder of
+    files, addressed by paths relative to the asset.
+    """
+
+    @abstractmethod
+    def resolve_version(self, name: str, version: str = 'latest') -> str:
+        """
+        The concrete version 'latest' (or any label) refers to
+        """
+
+    @abstractmethod
+    def list_files(self, name: str, version: str) -> dict:
+        """
+        ``{relative_path: size_in_bytes}`` of every file in the asset
+        """
+
+    @abstractmethod
+    def download_file(self, name: str, version: str, relative_path: str, local_path: str):
+        """
+        Copy one file of the asset to ``local_path``
+        """
+
+    def release(self, name: str, version: str):
+        """
+        Free whatever was kept while the files of a version were fetched
+        """
+
+
+class LocalBackend(DatasetBackend):
+    """
+    Datasets stored as ``root/<name>/<version>/...``: a local stand-in for the
+    Azure ML workspace, e.g. for tests or a shared mount.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def resolve_version(self, name: str, version: str = 'latest') -> str:
+        if version != 'latest':
+            return version
+        versions = os.listdir(os.path.join(self.root, name))
+        if not versions:
+            raise FileNotFoundError(f"No versions of dataset '{name}' under {self.root}")
+        # Numeric versions compare as numbers, as Azure ML orders them
+        return max(versions, key=lambda v: (v.isdigit(), int(v) if v.isdigit() else 0, v))
+
+    def list_files(self, name: str, version: str) -> dict:
+        return _list_local_files(os.path.join(self.root, name, version))
+
+    def download_file(self, name: str, version: str, relative_path: str, local_path: str):
+        shutil.copyfile(os.path.join(self.root, name, version, relative_path), local_path)
+
+
+class AzureMLBackend(DatasetBackend):
+    """
+    Data assets of an Azure ML workspace, read through the azureml-fsspec
+    filesystem so the files of a folder asset can be fetched one by one.
+    Without that package the whole asset is downloaded with
+    ``ml_client.data.download`` into a temporary folder and its files are
+    handed over from there. The MLClient is created once, on first use.
+    """
+
+    def __init__(self, subscription_id: str, resource_group_name: str, workspace_name: str):
+        self.subscription_id = subscription_id
+        self.resource_group_name = resource_group_name
+        self.workspace_name = workspace_name
+        self._client = None
+        self._assets = {}
+        # (name, version) -> temporary folder holding a whole downloaded asset
+        self._downloads = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                from azure.ai.ml import MLClient
+                from azure.identity import DefaultAzureCredential
+            except Exception:
+                raise RuntimeError(
+                    "Azure ML SDK not available in this environment. Either pass the dataset "
+                    "as a mounted input file (recommended) or run in an environment that has "
+                    "the 'azure-ai-ml' and 'azure-identity' packages installed and configured."
+                )
+            self._client = MLClient(
+                DefaultAzureCredential(),
+                subscription_id=self.subscription_id,
+                resource_group_name=self.resource_group_name,
+                workspace_name=self.workspace_name,
+            )
+        return self._client
+
+    def _asset(self, name: str, version: str):
+        if (name, version) not in self._assets:
+            if version == 'latest':
+                asset = self.client.data.get(name=name, label='latest')
+            else:
+                asset = self.client.data.get(name=name, version=version)
+            self._assets[(name, asset.version)] = asset
+            self._assets[(name, version)] = asset
+        return self._assets[(name, version)]
+
+    def _filesystem(self, asset):
+        try:
+            from azureml.fsspec import AzureMachineLearningFileSystem
+        except ImportError:
+            return None
+        return AzureMachineLearningFileSystem(asset.path)
+
+    def _download_asset(self, name: str, version: str) -> str:
+        if (name, version) not in self._downloads:
+            print("azureml-fsspec is not installed; downloading the whole data asset instead.")
+            local_dir = tempfile.mkdtemp(prefix='dataset-')
+            self.client.data.download(name=name, version=version, download_path=local_dir)
+            self._downloads[(name, version)] = local_dir
+        return self._downloads[(name, version)]
+
+    def resolve_version(self, name: str, version: str = 'latest') -> str:
+        # An explicit version needs no lookup, so a cache hit stays offline
+        if version != 'latest':
+            return version
+        return str(self._asset(name, version).version)
+
+    def list_files(self, name: str, version: str) -> dict:
+        asset = self._asset(name, version)
+        fs = self._filesystem(asset)
+        if fs is None:
+            return _list_local_files(self._download_asset(name, version))
+        base = asset.path.rstrip('/')
+        if fs.isfile(base):
+            return {os.path.basename(base): fs.size(base)}
+        # find() reports paths without the azureml:// prefix, like info()['name']
+        base_name = fs.info(base)['name'].rstrip('/')
+        return {
+            posixpath.relpath(path, base_name): info.get('size')
+            for path, info in fs.find(base, detail=True).items()
+        }
+
+    def download_file(self, name: str, version: str, relative_path: str, local_path: str):
+        if (name, version) in self._downloads:
+            shutil.move(os.path.join(self._downloads[(name, version)], relative_path), local_path)
+            return
+        asset = self._asset(name, version)
+        fs = self._filesystem(asset)
+        base = asset.path.rstrip('/')
+        remote = base if fs.isfile(base) else f'{base}/{relative_path}'
+        fs.get(remote, local_path)
+
+    def release(self, name: str, version: str):
+        local_dir = self._downloads.pop((name, version), None)
+        if local_dir is not None:
+            shutil.rmtree(local_dir, ignore_errors=True)
+
+
+class DatasetCache:
+    """
+    Local copies of dataset versions, keyed by asset name and version, so
+    repeated runs do not download them again.
+
+    Each cached version keeps a manifest of its files' sizes and SHA-256
+    checksums. A copy that no longer matches its manifest is downloaded again.
+    Files of folder assets are downloaded, hashed and read ``workers`` at a
+    time. Versions are evicted least recently used first once the cache
+    grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, backend: DatasetBackend, max_bytes: int = 50 * 1024 ** 3,
+                 workers: int = 8, verify: bool = True):
+        self.cache_dir = cache_dir
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.verify = verify
+        # Entries already checked (or downloaded) by this process
+        self._validated = set()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, name: str, version: str) -> str:
+        return os.path.join(self.cache_dir, name, version)
+
+    def fetch(self, name: str, version: str = 'latest') -> list:
+        """
+        Local paths of every file of a dataset version, downloading it first
+        unless a valid copy is already cached.
+        """
+        version = self.backend.resolve_version(name, version)
+        entry = self._entry_dir(name, version)
+        manifest = self._read_manifest(entry)
+        if manifest is not None and (entry in self._validated or self._is_valid(entry, manifest)):
+            print(f"Using cached dataset '{name}' version {version}")
+        else:
+            manifest = self._download(name, version, entry)
+        self._validated.add(entry)
+        # The manifest's mtime marks when the version was last used
+        os.utime(os.path.join(entry, MANIFEST_FILENAME))
+        self._evict(keep=entry)
+        return [os.path.join(entry, 'files', path) for path in sorted(manifest['files'])]
+
+    def _read_manifest(self, entry: str):
+        try:
+            with open(os.path.join(entry, MANIFEST_FILENAME)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_valid(self, entry: str, manifest: dict) -> bool:
+        paths = {path: os.path.join(entry, 'files', path) for path in manifest['files']}
+        for path, local_path in paths.items():
+            if not os.path.exists(local_path) or os.path.getsize(local_path) != manifest['files'][path]['size']:
+                return False
+        if not self.verify:
+            return True
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            checksums = dict(zip(paths, pool.map(file_sha256, paths.values())))
+        return all(checksums[path] == manifest['files'][path]['sha256'] for path in paths)
+
+    def _download(self, name: str, version: str, entry: str) -> dict:
+        try:
+            return self._download_files(name, version, entry)
+        finally:
+            self.backend.release(name, version)
+
+    def _download_files(self, name: str, version: str, entry: str) -> dict:
+        files = self.backend.list_files(name, version)
+        print(f"Downloading dataset '{name}' version {version} ({len(files)} files)...")
+        start = time.perf_counter()
+
+        # Download into a staging folder, so an interrupted run never leaves a partial entry
+        staging = entry + '.partial'
+        shutil.rmtree(staging, ignore_errors=True)
+
+        def download(path):
+            local_path = os.path.join(staging, 'files', path)
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            self.backend.download_file(name, version, path, local_path)
+            size = os.path.getsize(local_path)
+            if files[path] is not None and size != files[path]:
+                raise IOError(f"Downloaded {size} bytes of '{path}' in dataset '{name}', expected {files[path]}")
+            return path, {'size': size, 'sha256': file_sha256(local_path)}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            manifest = {'name': name, 'version': version, 'files': dict(pool.map(download, files))}
+        with open(os.path.join(staging, MANIFEST_FILENAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        os.replace(staging, entry)
+        print(f"Downloaded dataset '{name}' version {version} in {time.perf_counter() - start:.2f}s")
+        return manifest
+
+    def _entries(self) -> dict:
+        entries = {}
+        for name in os.listdir(self.cache_dir):
+            name_dir = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(name_dir):
+                continue
+            for version in os.listdir(name_dir):
+                entry = os.path.join(name_dir, version)
+                manifest = self._read_manifest(entry)
+                if manifest is None:
+                    continue
+                size = sum(file['size'] for file in manifest['files'].values())
+                entries[entry] = (size, os.path.getmtime(os.path.join(entry, MANIFEST_FILENAME)))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for size, _ in self._entries().values())
+
+    def _evict(self, keep: str = None):
+        entries = self._entries()
+        total = sum(size for size, _ in entries.values())
+        for entry, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            self._validated.discard(entry)
+            total -= size
+
+    def invalidate(self, name: str = None):
+        """
+        Remove every cached dataset, or every cached version of one.
+        """
+        target = os.path.join(self.cache_dir, name) if name else self.cache_dir
+        shutil.rmtree(target, ignore_errors=True)
+        self._validated = {entry for entry in self._validated if os.path.exists(entry)}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def __repr__(self):
+        return f'DatasetCache(cache_dir={self.cache_dir}, backend={type(self.backend).__name__}, max_bytes={self.max_bytes})'
@@ -0,0 +1,391 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+DEPLOYMENT_STRATEGIES = ('replace', 'blue_green')
+DEPLOYMENT_COLOURS = ('blue', 'green')
+
+
+class RolloutError(RuntimeError):
+    """
+    Raised when a deployment fails to provision or a blue/green gate fails.
+    """
+
+
+class DeploymentClient(ABC):
+    """
+    The cloud operations the controller needs. ``begin_*`` calls start a
+    long-running operation and return straight away; the controller waits
+    on the matching ``*_state`` call instead, which returns None once the
+    resource does not exist.
+    """
+
+    @abstractmethod
+    def register_model(self, name: str, path: str, version: str, description: str) -> str:
+        """
+        Register a model and return its ID
+        """
+
+    @abstractmethod
+    def endpoint_state(self, endpoint: str):
+        """
+        Provisioning state of an endpoint ('Succeeded', 'Failed', ...), or None
+        """
+
+    @abstractmethod
+    def begin_create_endpoint(self, endpoint: str):
+        pass
+
+    @abstractmethod
+    def begin_delete_endpoint(self, endpoint: str):
+        pass
+
+    @abstractmethod
+    def deployment_state(self, endpoint: str, deployment: str):
+        """
+        Provisioning state of a deployment, or None
+        """
+
+    @abstractmethod
+    def begin_create_deployment(self, endpoint: str, deployment: str, model_id: str, instance_type: str,
+                                instance_count: int):
+        pass
+
+    @abstractmethod
+    def begin_delete_deployment(self, endpoint: str, deployment: str):
+        pass
+
+    @abstractmethod
+    def get_traffic(self, endpoint: str) -> dict:
+        """
+        ``{deployment: percent}`` of the endpoint's traffic
+        """
+
+    @abstractmethod
+    def set_traffic(self, endpoint: str, traffic: dict):
+        """
+        Route traffic by ``{deployment: percent}``, returning once applied
+        """
+
+    @abstractmethod
+    def get_key(self, endpoint: str) -> str:
+        pass
+
+    @abstractmethod
+    def scoring_uri(self, endpoint: str) -> str:
+        pass
+
+
+class AzureMLDeploymentClient(DeploymentClient):
+    """
+    Managed online endpoints and deployments of an Azure ML workspace.
+    """
+
+    def __init__(self, ml_client):
+        self.ml_client = ml_client
+
+    def register_model(self, name: str, path: str, version: str, description: str) -> str:
+        from azure.ai.ml.entities import Model
+
+        model = Model(name=name, path=path, type="custom_model", version=version, description=description)
+        try:
+            model = self.ml_client.models.create_or_update(model)
+            print(f"Model registered: {model.name} version {model.version}")
+            return model.id
+        except Exception as e:
+            # The deployment can still refer to the model by name and version
+            print(f"Model registration failed: {e}")
+            print("Attempting to continue with endpoint creation anyway...")
+            return f"azureml:{name}:{version}"
+
+    def endpoint_state(self, endpoint: str):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return self.ml_client.online_endpoints.get(endpoint).provisioning_state
+        except ResourceNotFoundError:
+            return None
+
+    def begin_create_endpoint(self, endpoint: str):
+        from azure.ai.ml.entities import ManagedOnlineEndpoint
+
+        self.ml_client.online_endpoints.begin_create_or_update(ManagedOnlineEndpoint(name=endpoint, auth_mode="key"))
+
+    def begin_delete_endpoint(self, endpoint: str):
+        self.ml_client.online_endpoints.begin_delete(endpoint)
+
+    def deployment_state(self, endpoint: str, deployment: str):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return self.ml_client.online_deployments.get(deployment, endpoint).provisioning_state
+        except ResourceNotFoundError:
+            return None
+
+    def begin_create_deployment(self, endpoint: str, deployment: str, model_id: str, instance_type: str,
+                                instance_count: int):
+        from azure.ai.ml.entities import ManagedOnlineDeployment
+
+        self.ml_client.online_deployments.begin_create_or_update(ManagedOnlineDeployment(
+            name=deployment,
+            endpoint_name=endpoint,
+            model=model_id,
+            instance_type=instance_type,
+            instance_count=instance_count,
+        ))
+
+    def begin_delete_deployment(self, endpoint: str, deployment: str):
+        self.ml_client.online_deployments.begin_delete(name=deployment, endpoint_name=endpoint)
+
+    def get_traffic(self, endpoint: str) -> dict:
+        return dict(self.ml_client.online_endpoints.get(endpoint).traffic or {})
+
+    def set_traffic(self, endpoint: str, traffic: dict):
+        online_endpoint = self.ml_client.online_endpoints.get(endpoint)
+        online_endpoint.traffic = traffic
+        self.ml_client.online_endpoints.begin_create_or_update(online_endpoint).result()
+
+    def get_key(self, endpoint: str) -> str:
+        return self.ml_client.online_endpoints.get_keys(endpoint).primary_key
+
+    def scoring_uri(self, endpoint: str) -> str:
+        return self.ml_client.online_endpoints.get(endpoint).scoring_uri
+
+
+class FakeDeploymentClient(DeploymentClient):
+    """
+    In-memory stand-in for AzureMLDeploymentClient. Every operation takes
+    ``provision_seconds`` to finish; deployments named in ``failing`` end
+    in the 'Failed' state. Scoring goes to ``scoring_url``, e.g. a local
+    score_server.py (see load_test.start_mock_server). ``events`` records
+    ``(seconds since creation, operation, name)`` for every call.
+    """
+
+    def __init__(self, provision_seconds: float = 0.5, scoring_url: str = None, failing: tuple = ()):
+        self.provision_seconds = provision_seconds
+        self.scoring_url = scoring_url
+        self.failing = set(failing)
+        self.endpoints = {}
+        self.deployments = {}
+        self.traffic = {}
+        self.models = {}
+        self.events = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _event(self, operation: str, name: str):
+        with self._lock:
+            self.events.append((round(time.perf_counter() - self._start, 3), operation, name))
+
+    def _state(self, resource):
+        if resource is None:
+            return None
+        state, ready_at = resource
+        if time.perf_counter() < ready_at:
+            return 'Deleting' if state is None else 'Creating'
+        return state
+
+    def register_model(self, name: str, path: str, version: str, description: str) -> str:
+        self._event('register_model', name)
+        time.sleep(self.provision_seconds)
+        self.models[(name, version)] = path
+        return f"azureml:{name}:{version}"
+
+    def endpoint_state(self, endpoint: str):
+        return self._state(self.endpoints.get(endpoint))
+
+    def begin_create_endpoint(self, endpoint: str):
+        self._event('create_endpoint', endpoint)
+        self.endpoints[endpoint] = ('Succeeded', time.perf_counter() + self.provision_seconds)
+
+    def begin_delete_endpoint(self, endpoint: str):
+        self._event('delete_endpoint', endpoint)
+        self.endpoints[endpoint] = (None, time.perf_counter() + self.provision_seconds)
+        self.traffic.pop(endpoint, None)
+        for key in [key for key in self.deployments if key[0] == endpoint]:
+            del self.deployments[key]
+
+    def deployment_state(self, endpoint: str, deployment: str):
+        return self._state(self.deployments.get((endpoint, deployment)))
+
+    def begin_create_deployment(self, endpoint: str, deployment: str, model_id: str, instance_type: str,
+                                instance_count: int):
+        self._event('create_deployment', deployment)
+        state = 'Failed' if deployment in self.failing else 'Succeeded'
+        self.deployments[(endpoint, deployment)] = (state, time.perf_counter() + self.provision_seconds)
+
+    def begin_delete_deployment(self, endpoint: str, deployment: str):
+        self._event('delete_deployment', deployment)
+        self.deployments[(endpoint, deployment)] = (None, time.perf_counter() + self.provision_seconds)
+
+    def get_traffic(self, endpoint: str) -> dict:
+        return dict(self.traffic.get(endpoint, {}))
+
+    def set_traffic(self, endpoint: str, traffic: dict):
+        self._event('set_traffic', str(traffic))
+        self.traffic[endpoint] = dict(traffic)
+
+    def get_key(self, endpoint: str) -> str:
+        return 'fake-key'
+
+    def scoring_uri(self, endpoint: str) -> str:
+        return self.scoring_url
+
+
+class HealthGate:
+    """
+    Blue/green gate: sends ``n_requests`` of ``payloads`` to one deployment
+    of the endpoint (routed by the ``azureml-model-deployment`` header) and
+    passes if the error rate and p95 latency are within bounds.
+    """
+
+    def __init__(self, payloads: list, n_requests: int = 50, concurrency: int = 4, max_p95_ms: float = 1000.0,
+                 max_error_rate: float = 0.01, timeout: float = 30.0):
+        self.payloads = payloads
+        self.n_requests = n_requests
+        self.concurrency = concurrency
+        self.max_p95_ms = max_p95_ms
+        self.max_error_rate = max_error_rate
+        self.timeout = timeout
+
+    def __call__(self, client: DeploymentClient, endpoint: str, deployment: str):
+        from load_test import LoadTest
+
+        headers = {
+            "Authorization": f"Bearer {client.get_key(endpoint)}",
+            "azureml-model-deployment": deployment,
+        }
+        load_test = LoadTest(client.scoring_uri(endpoint), self.payloads, headers=headers, timeout=self.timeout,
+                             max_workers=self.concurrency)
+        try:
+            elapsed = load_test.run_fixed_concurrency(self.concurrency, n_requests=self.n_requests)
+        finally:
+            load_test.client.close()
+        report = load_test.report(elapsed, {"deployment": deployment, "requests": self.n_requests})
+        p95 = report["latency"].get("p95_ms")
+        passed = report["error_rate"] <= self.max_error_rate and p95 is not None and p95 <= self.max_p95_ms
+        return passed, {"error_rate": report["error_rate"], "p95_ms": p95, "passed": passed}
+
+
+class DeploymentController:
+    """
+    Deploys a model to a managed online endpoint through a DeploymentClient.
+
+    Model registration and endpoint provisioning run concurrently; the
+    deployment is created as soon as both are done. Long-running operations
+    are waited on by polling with exponential backoff, from
+    ``initial_delay`` up to ``max_delay`` seconds, for at most ``timeout``.
+
+    'replace' updates the live deployment (or 'blue') and routes all
+    traffic to it. 'blue_green' creates the other colour next to the live
+    deployment and moves traffic over in ``traffic_steps``; after each step
+    and ``bake_seconds``, ``gate(client, endpoint, deployment)`` must return
+    ``(passed, details)`` with passed true, or traffic goes back to the old
+    deployment and the new one is deleted.
+    """
+
+    def __init__(self, client: DeploymentClient, endpoint_name: str, instance_type: str = "Standard_DS3_v2",
+                 instance_count: int = 1, timeout: float = 600.0, initial_delay: float = 1.0, max_delay: float = 30.0):
+        self.client = client
+        self.endpoint_name = endpoint_name
+        self.instance_type = instance_type
+        self.instance_count = instance_count
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+
+    def wait_for(self, description: str, get_state, target='Succeeded') -> str:
+        """
+        Poll ``get_state()`` with exponential backoff until it returns ``target``.
+        """
+        start = time.perf_counter()
+        delay = self.initial_delay
+        while True:
+            state = get_state()
+            if state == target:
+                print(f"{description}: {state} after {time.perf_counter() - start:.1f}s")
+                return state
+            if state == 'Failed':
+                raise RolloutError(f"{description} failed")
+            if time.perf_counter() - start + delay > self.timeout:
+                raise TimeoutError(f"{description} still {state} after {self.timeout:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_delay)
+
+    def ensure_endpoint(self) -> dict:
+        """
+        Create the endpoint (recreating it if it failed or is being deleted)
+        and return its traffic once ready.
+        """
+        endpoint = self.endpoint_name
+        state = self.client.endpoint_state(endpoint)
+        print(f"Endpoint '{endpoint}' state: {state}")
+        if state == 'Failed':
+            print(f"Endpoint '{endpoint}' is in Failed state, deleting completely...")
+            self.client.begin_delete_endpoint(endpoint)
+            state = 'Deleting'
+        if state == 'Deleting':
+            # It cannot be created again until the deletion has finished
+            self.wait_for(f"Deleting endpoint '{endpoint}'", lambda: self.client.endpoint_state(endpoint), None)
+            state = None
+        if state is None:
+            print(f"Creating endpoint '{endpoint}'...")
+            self.client.begin_create_endpoint(endpoint)
+        self.wait_for(f"Endpoint '{endpoint}'", lambda: self.client.endpoint_state(endpoint))
+        return self.client.get_traffic(endpoint)
+
+    def deploy(self, model_name: str, model_path: str, version: str, description: str = "",
+               strategy: str = 'replace', traffic_steps=(10, 50, 100), bake_seconds: float = 0.0, gate=None,
+               keep_previous: bool = False) -> dict:
+        if strategy not in DEPLOYMENT_STRATEGIES:
+            raise ValueError(f"Unknown deployment strategy '{strategy}', expected one of {DEPLOYMENT_STRATEGIES}")
+        endpoint = self.endpoint_name
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            model_future = pool.submit(self.client.register_model, model_name, model_path, version, description)
+            endpoint_future = pool.submit(self.ensure_endpoint)
+            model_id = model_future.result()
+            traffic = endpoint_future.result()
+
+        live = max(traffic, key=traffic.get) if any(traffic.values()) else None
+        if strategy == 'replace' or live is None:
+            deployment = live or DEPLOYMENT_COLOURS[0]
+        else:
+            deployment = DEPLOYMENT_COLOURS[1] if live == DEPLOYMENT_COLOURS[0] else DEPLOYMENT_COLOURS[0]
+
+        print(f"Deploying {model_id} as '{deployment}' (live: {live})...")
+        self.client.begin_create_deployment(endpoint, deployment, model_id, self.instance_type, self.instance_count)
+        self.wait_for(f"Deployment '{deployment}'", lambda: self.client.deployment_state(endpoint, deployment))
+
+        summary = {"endpoint": endpoint, "model_id": model_id, "deployment": deployment, "previous": live,
+                   "strategy": strategy, "gates": []}
+        if deployment == live or live is None:
+            print(f"Routing all traffic to '{deployment}'...")
+            self.client.set_traffic(endpoint, {deployment: 100})
+            return summary
+
+        self._shift_traffic(live, deployment, traffic_steps, bake_seconds, gate, summary)
+        if not keep_previous:
+            self.client.set_traffic(endpoint, {deployment: 100})
+            print(f"Deleting previous deployment '{live}'...")
+            self.client.begin_delete_deployment(endpoint, live)
+        return summary
+
+    def _shift_traffic(self, old: str, new: str, traffic_steps, bake_seconds: float, gate, summary: dict):
+        endpoint = self.endpoint_name
+        for percent in traffic_steps:
+            print(f"Routing {percent}% of traffic to '{new}'...")
+            self.client.set_traffic(endpoint, {new: percent, old: 100 - percent})
+            if bake_seconds:
+                time.sleep(bake_seconds)
+            if gate is None:
+                continue
+            passed, details = gate(self.client, endpoint, new)
+            summary["gates"].append(dict(details, traffic_percent=percent))
+            print(f"Gate at {percent}%: {details}")
+            if not passed:
+                print(f"Gate failed; routing all traffic back to '{old}' and deleting '{new}'...")
+                self.client.set_traffic(endpoint, {old: 100})
+                self.client.begin_delete_deployment(endpoint, new)
+                raise RolloutError(f"Rollout of '{new}' stopped at {percent}% of traffic: {details}")
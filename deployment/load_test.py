@@ -0,0 +1,276 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+# Shared readers live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_io import read_frame
+from scoring_client import ScoringClient, latency_percentiles
+
+
+# -----------------------------
+# Request payloads
+# -----------------------------
+def payloads_from_test_data(path: str, rows_per_request: int, max_payloads: int) -> list:
+    """
+    Request bodies of ``rows_per_request`` rows each from a processed test
+    file, with the target column removed.
+    """
+    df = read_frame(path)
+    df = df.drop(columns=[col for col in ("target", "Priority") if col in df.columns])
+    starts = range(0, len(df), rows_per_request)[:max_payloads]
+    return ['{"data":' + df.iloc[start:start + rows_per_request].to_json(orient="records") + "}" for start in starts]
+
+
+def payloads_from_jsonl(path: str, rows_per_request: int, max_payloads: int) -> list:
+    """
+    Request bodies from a JSON-lines file: lines holding a full ``{"data": [...]}``
+    body are replayed as they are, other lines are single records grouped
+    ``rows_per_request`` at a time.
+    """
+    payloads, records = [], []
+    with open(path) as f:
+        for line in f:
+            if len(payloads) >= max_payloads:
+                break
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, dict) and "data" in item:
+                payloads.append(json.dumps(item))
+                continue
+            records.append(item)
+            if len(records) == rows_per_request:
+                payloads.append(json.dumps({"data": records}))
+                records = []
+    if records and len(payloads) < max_payloads:
+        payloads.append(json.dumps({"data": records}))
+    return payloads
+
+
+# -----------------------------
+# Load generation
+# -----------------------------
+class LoadTest:
+    """
+    Replays request bodies round-robin against a scoring URL, either at a
+    fixed rate (open loop: requests are sent on schedule however slow the
+    endpoint gets) or with a fixed number of concurrent clients (closed loop).
+    Requests are not retried; every failure counts as an error.
+    """
+
+    def __init__(self, url: str, payloads: list, headers: dict = None, timeout: float = 30.0, max_workers: int = 64):
+        if not payloads:
+            raise ValueError("No request payloads to replay")
+        self.url = url
+        self.payloads = payloads
+        self.max_workers = max_workers
+        self.client = ScoringClient(url, headers=headers, max_concurrency=max_workers, max_retries=0, timeout=timeout)
+        self.results = []
+        self._lock = threading.Lock()
+
+    def _send(self, index: int, scheduled: float = None):
+        body = self.payloads[index % len(self.payloads)]
+        start = time.perf_counter()
+        status, response_bytes, error = None, 0, None
+        try:
+            response = self.client.post(body)
+            status, response_bytes = response.status_code, len(response.content)
+        except requests.RequestException as e:
+            if e.response is not None:
+                status, response_bytes = e.response.status_code, len(e.response.content)
+            error = type(e).__name__
+        end = time.perf_counter()
+        with self._lock:
+            self.results.append({
+                "latency": end - start,
+                # From the scheduled send time, so a backed-up endpoint cannot hide its queueing
+                "latency_from_schedule": end - (scheduled if scheduled is not None else start),
+                "status": status,
+                "error": error,
+                "request_bytes": len(body),
+                "response_bytes": response_bytes,
+            })
+
+    def run_fixed_rps(self, rps: float, duration: float = None, n_requests: int = None) -> float:
+        n_requests = n_requests or int(rps * duration)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for i in range(n_requests):
+                scheduled = start + i / rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self._send, i, scheduled)
+        return time.perf_counter() - start
+
+    def run_fixed_concurrency(self, concurrency: int, duration: float = None, n_requests: int = None) -> float:
+        counter = iter(range(n_requests)) if n_requests else itertools.count()
+        counter_lock = threading.Lock()
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+
+        def client_loop():
+            while True:
+                with counter_lock:
+                    index = next(counter, None)
+                if index is None or (deadline is not None and time.perf_counter() >= deadline):
+                    return
+                self._send(index)
+
+        threads = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float, settings: dict) -> dict:
+        results = self.results
+        ok = [r for r in results if r["error"] is None]
+        status_counts = {}
+        for r in results:
+            key = str(r["status"] or r["error"])
+            status_counts[key] = status_counts.get(key, 0) + 1
+        request_bytes = [r["request_bytes"] for r in results]
+        response_bytes = [r["response_bytes"] for r in ok]
+        return {
+            "url": self.url,
+            "settings": settings,
+            "requests": len(results),
+            "succeeded": len(ok),
+            "errors": len(results) - len(ok),
+            "error_rate": round((len(results) - len(ok)) / len(results), 4) if results else None,
+            "status_counts": status_counts,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else None,
+            "latency": latency_percentiles([r["latency"] for r in ok]),
+            "latency_from_schedule": latency_percentiles([r["latency_from_schedule"] for r in ok]),
+            "request_bytes": {
+                "mean": round(float(np.mean(request_bytes)), 1) if request_bytes else None,
+                "max": int(max(request_bytes)) if request_bytes else None,
+                "total": int(sum(request_bytes)),
+            },
+            "response_bytes": {
+                "mean": round(float(np.mean(response_bytes)), 1) if response_bytes else None,
+                "total": int(sum(response_bytes)),
+            },
+        }
+
+
+# -----------------------------
+# Local mock endpoint
+# -----------------------------
+class MockScorer:
+    """
+    Stands in for a model: predicts 0 for every row after ``latency_ms``.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+
+    def prepare(self, features):
+        return features
+
+    def predict_prepared(self, features):
+        if self.latency:
+            time.sleep(self.latency)
+        return np.zeros(len(features))
+
+
+def start_mock_server(model_dir: str = None, latency_ms: float = 0.0):
+    """
+    Serve deployment/score_server.py in a background thread, with the model
+    in ``model_dir`` or a MockScorer, and return ``(server, scoring_url)``.
+    """
+    from score_server import Scorer, make_server
+
+    scorer = Scorer.from_model_dir(model_dir) if model_dir else MockScorer(latency_ms)
+    server = make_server(scorer, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/score"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Load test a /score endpoint and report latency and throughput")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--test_data", type=str, help="Processed test file (CSV, Parquet or Feather) to replay rows from")
+    source.add_argument("--requests_file", type=str,
+                        help='JSON-lines file of {"data": [...]} request bodies or single records to replay')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--scoring_url", type=str, help="Endpoint to load, e.g. https://<endpoint>.<region>.inference.ml.azure.com/score")
+    target.add_argument("--mock", action="store_true", help="Start a local score_server.py stand-in and load that")
+    parser.add_argument("--api_key", type=str, default=None)
+    parser.add_argument("--mock_model_dir", type=str, default=None,
+                        help="With --mock, serve this model folder instead of a constant predictor")
+    parser.add_argument("--mock_latency_ms", type=float, default=0.0, help="With --mock, time the constant predictor takes")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rps", type=float, help="Send requests at this fixed rate (open loop)")
+    mode.add_argument("--concurrency", type=int, help="Keep this many requests in flight (closed loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run for (ignored with --requests)")
+    parser.add_argument("--requests", type=int, default=None, help="Send exactly this many requests")
+    parser.add_argument("--rows_per_request", type=int, default=1)
+    parser.add_argument("--max_payloads", type=int, default=10000, help="Distinct request bodies to prepare and cycle through")
+    parser.add_argument("--max_workers", type=int, default=64, help="Most requests in flight in --rps mode")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", type=str, default="load_test_report.json")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    if args.test_data:
+        payloads = payloads_from_test_data(args.test_data, args.rows_per_request, args.max_payloads)
+    else:
+        payloads = payloads_from_jsonl(args.requests_file, args.rows_per_request, args.max_payloads)
+    print(f"Prepared {len(payloads)} request payloads")
+
+    server = None
+    url = args.scoring_url
+    if args.mock:
+        server, url = start_mock_server(args.mock_model_dir, args.mock_latency_ms)
+        print(f"Started local mock endpoint at {url}")
+
+    headers = {"Authorization": f"Bearer {args.api_key}"} if args.api_key else None
+    max_workers = args.concurrency or args.max_workers
+    load_test = LoadTest(url, payloads, headers=headers, timeout=args.timeout, max_workers=max_workers)
+    duration = None if args.requests else args.duration
+
+    if args.rps:
+        print(f"Sending {args.rps} requests/s to {url}...")
+        elapsed = load_test.run_fixed_rps(args.rps, duration=duration, n_requests=args.requests)
+    else:
+        print(f"Sending requests from {args.concurrency} concurrent clients to {url}...")
+        elapsed = load_test.run_fixed_concurrency(args.concurrency, duration=duration, n_requests=args.requests)
+
+    settings = {
+        "mode": "fixed_rps" if args.rps else "fixed_concurrency",
+        "rps": args.rps,
+        "concurrency": args.concurrency,
+        "duration_s": duration,
+        "requests": args.requests,
+        "rows_per_request": args.rows_per_request,
+        "mock": args.mock,
+    }
+    report = load_test.report(elapsed, settings)
+    load_test.client.close()
+    if server is not None:
+        server.shutdown()
+
+    print(json.dumps(report, indent=2))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Load test report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
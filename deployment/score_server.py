@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+# Shared pipeline code lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model_artifact import load_artifact
+from pipeline.pipeline import Pipeline
+
+MODEL_FILENAME = "model.joblib"
+PIPELINE_FILENAME = "pipeline.joblib"
+
+
+# -----------------------------
+# Scoring
+# -----------------------------
+class Scorer:
+    """
+    Holds the model and, optionally, the fitted preprocessing pipeline, both
+    loaded once. With a pipeline, requests carry raw ITSM rows; without one
+    they carry already processed features, as test_endpoint.py sends them.
+    """
+
+    def __init__(self, model, pipeline: Pipeline = None):
+        self.model = model
+        self.pipeline = pipeline
+        if pipeline is not None:
+            pipeline.set_log_level("quiet")
+            # A server transforms for as long as it runs: keep no step records
+            pipeline.keep_records = False
+        # Steps keep per-run state (stats, parser caches), so one request
+        # transforms at a time
+        self._pipeline_lock = threading.Lock()
+        self.feature_names = list(getattr(model, "feature_names_in_", []))
+
+    @classmethod
+    def from_model_dir(cls, model_dir: str, preprocess: bool = False) -> "Scorer":
+        model = load_artifact(os.path.join(model_dir, MODEL_FILENAME))
+        pipeline = Pipeline.load(os.path.join(model_dir, PIPELINE_FILENAME)) if preprocess else None
+        return cls(model, pipeline)
+
+    def prepare(self, features: pd.DataFrame) -> pd.DataFrame:
+        """
+        Turn the rows of one request into model features. Rows the pipeline
+        drops (e.g. a missing Priority) are left out; the index of the rest
+        is kept, so predictions can be matched back to their rows. Raises
+        ValueError when a feature column is missing or rows cannot be turned
+        into features.
+        """
+        if self.pipeline is not None:
+            try:
+                with self._pipeline_lock:
+                    features = self.pipeline.transform(features)
+            except Exception as e:
+                raise ValueError(f"Could not prepare features: {e}") from e
+        if self.feature_names:
+            missing = [col for col in self.feature_names if col not in features.columns]
+            if missing:
+                raise ValueError(f"Missing feature columns: {missing}")
+            # Same column order as in training; extra columns (e.g. the target) are ignored
+            features = features[self.feature_names]
+        try:
+            # JSON carries missing values as null, which arrive as None in object columns
+            return features.astype(float)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Could not prepare features: {e}") from e
+
+    def predict_prepared(self, features: pd.DataFrame):
+        return self.model.predict(features)
+
+    def predict(self, features: pd.DataFrame):
+        return self.predict_prepared(self.prepare(features))
+
+
+class ScoreRequest:
+    """
+    One request waiting in a MicroBatcher: its prepared features, how many
+    rows it sent and the future its response is delivered through.
+    """
+
+    def __init__(self, features: pd.DataFrame, n_rows: int):
+        self.features = features
+        self.n_rows = n_rows
+        self.future = Future()
+
+    def resolve(self, predictions: list):
+        """
+        Deliver the predictions of the prepared rows, with null predictions
+        and an error for each row that was dropped while preparing.
+        """
+        results = [None] * self.n_rows
+        for row, prediction in zip(self.features.index, predictions):
+            results[row] = prediction
+        response = {"predictions": results}
+        dropped = sorted(set(range(self.n_rows)).difference(self.features.index))
+        if dropped:
+            response["errors"] = [
+                {"row": row, "error": "Row dropped by the preprocessing pipeline (e.g. missing Priority)"}
+                for row in dropped
+            ]
+        self.future.set_result(response)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent scoring requests into batches of up to
+    ``max_batch_size`` rows, waiting at most ``max_wait_ms`` after the first
+    request of a batch, and scores each batch with a single predict call.
+
+    Requests are prepared (preprocessed and validated) on their own before
+    they join a batch, so a bad request fails alone. Should the batched
+    predict call still fail, its requests are scored one at a time.
+    """
+
+    def __init__(self, scorer: Scorer, max_batch_size: int = 256, max_wait_ms: float = 5.0):
+        self.scorer = scorer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches_scored = 0
+        self.rows_scored = 0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, features: pd.DataFrame) -> Future:
+        """
+        Prepare the rows of a request, in the calling thread, and queue them
+        for scoring. Raises ValueError if the rows cannot be prepared.
+        """
+        features = features.reset_index(drop=True)
+        request = ScoreRequest(self.scorer.prepare(features), len(features))
+        if request.features.empty:
+            request.resolve([])
+        else:
+            self._queue.put(request)
+        return request.future
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        rows = len(batch[0].features)
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            rows += len(request.features)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._score(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0].future.set_exception(e)
+                    continue
+                # Score the requests one by one, so a failure only reaches its own request
+                for request in batch:
+                    try:
+                        self._score([request])
+                    except Exception as request_error:
+                        request.future.set_exception(request_error)
+
+    def _score(self, batch: list):
+        predictions = self.scorer.predict_prepared(pd.concat([request.features for request in batch])).tolist()
+        self.batches_scored += 1
+        self.rows_scored += len(predictions)
+        # Hand each request back its own slice of the batch
+        start = 0
+        for request in batch:
+            request.resolve(predictions[start:start + len(request.features)])
+            start += len(request.features)
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+def make_handler(batcher: MicroBatcher, request_timeout: float):
+
+    class ScoreHandler(BaseHTTPRequestHandler):
+        # Keep-alive, so pooled clients reuse their connections
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._send(404, {"error": "not found"})
+            self._send(200, {
+                "status": "ok",
+                "batches_scored": batcher.batches_scored,
+                "rows_scored": batcher.rows_scored,
+            })
+
+        def do_POST(self):
+            if self.path != "/score":
+                return self._send(404, {"error": "not found"})
+            try:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                features = pd.DataFrame.from_records(json.loads(body)["data"])
+            except (ValueError, KeyError, TypeError) as e:
+                return self._send(400, {"error": f"Expected a JSON body {{\"data\": [records]}}: {e}"})
+
+            if features.empty:
+                return self._send(200, {"predictions": []})
+            try:
+                future = batcher.submit(features)
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            try:
+                response = future.result(timeout=request_timeout)
+            except Exception as e:
+                return self._send(500, {"error": str(e)})
+            self._send(200, response)
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # One line per request is too noisy under load
+            pass
+
+    return ScoreHandler
+
+
+def make_server(scorer: Scorer, host: str = "127.0.0.1", port: int = 5001, max_batch_size: int = 256,
+                max_wait_ms: float = 5.0, request_timeout: float = 30.0) -> ThreadingHTTPServer:
+    batcher = MicroBatcher(scorer, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher, request_timeout))
+    server.daemon_threads = True
+    return server
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Azure ML scoring endpoint (POST /score)")
+    parser.add_argument("--model_dir", type=str, required=True, help="Folder holding model.joblib (train.py --model_output)")
+    parser.add_argument("--preprocess", action="store_true",
+                        help="Requests carry raw rows; apply pipeline.joblib from --model_dir before predicting")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--max_batch_size", type=int, default=256, help="Most rows scored in one predict call")
+    parser.add_argument("--max_wait_ms", type=float, default=5.0,
+                        help="How long a batch waits for more requests after its first one")
+    parser.add_argument("--request_timeout", type=float, default=30.0, help="Seconds a request waits for its predictions")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    scorer = Scorer.from_model_dir(args.model_dir, preprocess=args.preprocess)
+    server = make_server(scorer, host=args.host, port=args.port, max_batch_size=args.max_batch_size,
+                         max_wait_ms=args.max_wait_ms, request_timeout=args.request_timeout)
+    print(f"Scoring endpoint listening on http://{args.host}:{server.server_port}/score")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+# Responses worth retrying: throttling and transient server/gateway errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ScoringClient:
+    """
+    Scores a DataFrame against a ``/score`` endpoint in batches of
+    ``batch_size`` rows, with up to ``max_concurrency`` requests in flight
+    over one pooled session. Failed requests are retried with exponential
+    backoff, and predictions come back in the original row order.
+    """
+
+    def __init__(self, url: str, headers: dict = None, batch_size: int = 1000, max_concurrency: int = 4,
+                 max_retries: int = 3, backoff: float = 0.5, timeout: float = 60.0):
+        self.url = url
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.retries = 0
+        self._retry_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def score(self, features: pd.DataFrame):
+        """
+        Return ``(predictions, latencies)``: one prediction per row and the
+        wall time of each batch request in seconds.
+        """
+        starts = range(0, len(features), self.batch_size)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            # map keeps batch order, so the predictions line up with the rows
+            results = list(pool.map(lambda start: self._score_batch(features.iloc[start:start + self.batch_size]),
+                                    starts))
+
+        predictions = [prediction for batch_predictions, _ in results for prediction in batch_predictions]
+        latencies = [latency for _, latency in results]
+        return np.asarray(predictions), latencies
+
+    def _score_batch(self, batch: pd.DataFrame):
+        # Serialised per batch, inside the worker, so the whole set is never one payload;
+        # to_json also writes NaN as null, which plain json cannot
+        body = '{"data":' + batch.to_json(orient="records") + "}"
+        start = time.perf_counter()
+        response = self.post(body)
+        latency = time.perf_counter() - start
+        predictions = response.json()["predictions"]
+        if len(predictions) != len(batch):
+            raise ValueError(f"Endpoint returned {len(predictions)} predictions for {len(batch)} rows")
+        return predictions, latency
+
+    def post(self, body: str) -> requests.Response:
+        """
+        POST a request body, retrying connection errors and retryable statuses.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.url, data=body, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response
+                error = requests.HTTPError(f"{response.status_code} from {self.url}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt == self.max_retries:
+                raise error
+            with self._retry_lock:
+                self.retries += 1
+            # Exponential backoff with jitter, so concurrent batches do not retry in lockstep
+            time.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def latency_percentiles(latencies: list) -> dict:
+    """
+    p50/p95/p99/max of a list of latencies in seconds, reported in milliseconds.
+    """
+    if not latencies:
+        return {}
+    values = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
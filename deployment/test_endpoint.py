@@ -1,39 +1,80 @@
 import argparse
-import pandas as pd
-import requests
+import json
+import os
+import sys
+import time
 from sklearn.metrics import accuracy_score, r2_score, mean_squared_error
 
+# Shared readers live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_io import read_frame
+from scoring_client import ScoringClient, latency_percentiles
+
 parser = argparse.ArgumentParser()
 parser.add_argument("--test_data", type=str, required=True)
-parser.add_argument("--endpoint_name", type=str, required=True)
-parser.add_argument("--api_key", type=str, required=True)
-parser.add_argument("--workspace_region", type=str, required=True)
+parser.add_argument("--endpoint_name", type=str, default=None)
+parser.add_argument("--api_key", type=str, default=None)
+parser.add_argument("--workspace_region", type=str, default=None)
+parser.add_argument("--scoring_url", type=str, default=None,
+                    help="Score against this URL instead (e.g. a local deployment/score_server.py)")
+parser.add_argument("--batch_size", type=int, default=1000, help="Rows per scoring request")
+parser.add_argument("--max_concurrency", type=int, default=4, help="Scoring requests in flight at once")
+parser.add_argument("--max_retries", type=int, default=3, help="Retries per request, with exponential backoff")
+parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for each request")
+parser.add_argument("--report_output", type=str, default=None, help="Optional path for a JSON report of the run")
 args = parser.parse_args()
 
+if args.scoring_url is None and not (args.endpoint_name and args.workspace_region):
+    parser.error("--endpoint_name and --workspace_region are required unless --scoring_url is given")
+
 # Load test data
-df_test = pd.read_csv(args.test_data)
+df_test = read_frame(args.test_data)
 target_col = "target" if "target" in df_test.columns else "Priority"
 
 X_test = df_test.drop(columns=target_col)
 y_test = df_test[target_col]
 
 # Build endpoint URL
-url = f"https://{args.endpoint_name}.{args.workspace_region}.inference.ml.azure.com/score"
+url = args.scoring_url or f"https://{args.endpoint_name}.{args.workspace_region}.inference.ml.azure.com/score"
 
-headers = {
-    "Authorization": f"Bearer {args.api_key}",
-    "Content-Type": "application/json"
-}
+headers = {}
+if args.api_key:
+    headers["Authorization"] = f"Bearer {args.api_key}"
 
-payload = {"data": X_test.to_dict(orient="records")}
-response = requests.post(url, headers=headers, json=payload)
-predictions = response.json()["predictions"]
+# Score the test set in concurrent batches over one pooled session
+with ScoringClient(url, headers=headers, batch_size=args.batch_size, max_concurrency=args.max_concurrency,
+                   max_retries=args.max_retries, timeout=args.timeout) as client:
+    start = time.perf_counter()
+    predictions, latencies = client.score(X_test)
+    elapsed = time.perf_counter() - start
+    retries = client.retries
+
+latency = latency_percentiles(latencies)
+print(f"Scored {len(predictions)} rows in {len(latencies)} batches in {elapsed:.2f}s ({retries} retries)")
+print(f"Batch latency: {latency}")
 
 # Compute metric
 if df_test[target_col].dtype == "float" or df_test[target_col].dtype == "int":
     mse = mean_squared_error(y_test, predictions)
     r2 = r2_score(y_test, predictions)
+    metrics = {"mse": float(mse), "r2": float(r2)}
     print(f"Test MSE: {mse}, R2: {r2}")
 else:
     acc = accuracy_score(y_test, predictions)
+    metrics = {"accuracy": float(acc)}
     print(f"Test accuracy: {acc}")
+
+if args.report_output:
+    report = {
+        "rows": len(predictions),
+        "batches": len(latencies),
+        "batch_size": args.batch_size,
+        "max_concurrency": args.max_concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "retries": retries,
+        "batch_latency": latency,
+        "metrics": metrics,
+    }
+    with open(args.report_output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {args.report_output}")
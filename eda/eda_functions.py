@@ -1,5 +1,7 @@
 import matplotlib.pyplot as plt
 
+from eda.profiling import draw_missing_values, profile_dataset, write_report
+
 def view_dataset_summary(dataset):
     """
     Function to view summary statistics of the dataset.
@@ -21,21 +23,41 @@ def view_dataset_summary(dataset):
     print(dataset.describe())
 
     # Plot horizontal bar chart for missing values
-    missing_values = missing_values[missing_values > 0].sort_values(ascending=False)
     plt.figure(figsize=(10, 6))
-    bars = plt.barh(missing_values.index, missing_values.values, color='skyblue')
-    plt.title('Missing Values per Column')
-    plt.xlabel('Number of Missing Values')
-    plt.ylabel('Columns')
-    plt.gca().invert_yaxis()  # Invert y-axis for better readability
-
-    # Annotate bars with the exact numbers
-    for bar in bars:
-        plt.text(bar.get_width() + 0.5, bar.get_y() + bar.get_height() / 2,
-                 f'{int(bar.get_width())}', va='center')
-
+    draw_missing_values(plt.gca(), missing_values)
     plt.tight_layout()
     plt.show()
+
+
+def view_dataset_profile(source, report_dir: str = 'eda_report', chunk_size: int = 100_000, n_workers: int = 1,
+                         **options):
+    """
+    Scalable version of view_dataset_summary for datasets too large to load
+    or scan repeatedly: profiles a DataFrame or data file in one chunked
+    (optionally parallel) pass with mergeable sketches, prints the same
+    sections and writes the report to ``report_dir`` instead of showing a plot.
+    Distinct counts, duplicates and percentiles may be approximate; see
+    DatasetProfile.
+    """
+    profile = profile_dataset(source, chunk_size=chunk_size, n_workers=n_workers, **options)
+    print("Dataset Information:")
+    print(profile.head)
+    print("\nNumber of Rows and Columns:")
+    print(f"Rows: {profile.rows}, Columns: {len(profile.columns)}")
+    print("\nColumn Data Types:")
+    print(profile.dtypes())
+    print("\nNumber of Unique Values per Column:")
+    print(profile.nunique())
+    print("\nNumber of Missing Values per Column:")
+    print(profile.missing_values())
+    print("\nNumber of Duplicate Rows:")
+    print(profile.duplicates)
+    print("\nSummary Statistics for Numerical Columns:")
+    print(profile.describe())
+
+    paths = write_report(profile, report_dir)
+    print(f"\nReport written to {paths['json']} and {paths['png']}")
+    return profile
     
     
 def view_small_tables(dataset):
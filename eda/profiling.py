@@ -0,0 +1,486 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_io import iter_frame_chunks
+
+# Stands in for the hash of a missing value, whatever dtype the chunk it was
+# read from ended up with, so row hashes agree across chunks
+_NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+
+
+def hash_column(series: pd.Series):
+    """
+    64-bit hashes of the values of a column, hashes of its distinct non-null
+    values and its null count.
+
+    Values are factorized first so each distinct value is hashed once.
+    Numeric columns are hashed as float64, so a column read as int in one
+    chunk and float (because of a NaN) in another still hashes the same.
+    """
+    if _is_numeric(series):
+        codes, uniques = pd.factorize(series.to_numpy(dtype='float64', na_value=np.nan))
+    else:
+        codes, uniques = pd.factorize(series)
+        uniques = np.asarray(uniques, dtype=object)
+    # factorize marks missing values with -1, which indexes the trailing null hash
+    lookup = np.append(pd.util.hash_array(uniques, categorize=False), _NULL_HASH)
+    return lookup[codes], lookup[:-1], int((codes < 0).sum())
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    # describe() leaves boolean columns out of the numerical summary
+    return pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+
+
+class DistinctCounter:
+    """
+    Distinct count of 64-bit hashes, mergeable across chunks and partitions.
+
+    The hashes themselves are kept (so the count is exact) until there are
+    more than ``exact_limit`` of them; from then on they are folded into a
+    HyperLogLog sketch of ``2 ** precision`` one-byte registers, whose
+    relative error is about ``1.04 / sqrt(2 ** precision)`` (0.8% at 14).
+    """
+
+    def __init__(self, precision: int = 14, exact_limit: int = 4096):
+        if not 4 <= precision <= 18:
+            raise ValueError(f'HyperLogLog precision must be between 4 and 18, got {precision}')
+        self.precision = precision
+        self.exact_limit = exact_limit
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.registers = None
+
+    @property
+    def exact(self) -> bool:
+        return self.registers is None
+
+    def update(self, hashes: np.ndarray):
+        if self.exact:
+            self.hashes = np.union1d(self.hashes, hashes)
+            if len(self.hashes) > self.exact_limit:
+                self.registers = self._sketch(self.hashes)
+                self.hashes = np.empty(0, dtype=np.uint64)
+        else:
+            self._add(self.registers, hashes)
+        return self
+
+    def merge(self, other: 'DistinctCounter'):
+        if other.precision != self.precision:
+            raise ValueError(f'Cannot merge sketches of precision {self.precision} and {other.precision}')
+        if other.exact:
+            return self.update(other.hashes)
+        if self.exact:
+            self.registers = self._sketch(self.hashes)
+            self.hashes = np.empty(0, dtype=np.uint64)
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        if self.exact:
+            return len(self.hashes)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are empty
+            estimate = m * np.log(m / zeros)
+        # 64-bit hashes need no large-range correction
+        return int(round(estimate))
+
+    def _sketch(self, hashes: np.ndarray) -> np.ndarray:
+        registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        self._add(registers, hashes)
+        return registers
+
+    def _add(self, registers: np.ndarray, hashes: np.ndarray):
+        if not len(hashes):
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        # The remaining bits are below 2**50, so exact as float64 and frexp
+        # gives their bit length; rank is the position of the first 1 bit
+        _, bit_length = np.frexp((hashes & np.uint64((1 << width) - 1)).astype(np.float64))
+        rank = (width - bit_length + 1).astype(np.uint8)
+        np.maximum.at(registers, index, rank)
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of a stream of numbers, mergeable across chunks and
+    partitions (a KLL-style compactor).
+
+    Level ``i`` holds values standing for ``2 ** i`` originals. A level that
+    grows past ``k`` values is sorted and every other value, from a random
+    offset, is promoted to the next level, so at most about
+    ``k * log2(n / k)`` values are kept. Quantiles are exact (and interpolated
+    like pandas) until the first compaction.
+    """
+
+    def __init__(self, k: int = 1024, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.levels = []
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        if len(values):
+            self.count += len(values)
+            self._insert(0, np.asarray(values, dtype=float))
+            self._compact()
+        return self
+
+    def merge(self, other: 'QuantileSketch'):
+        for level, values in enumerate(other.levels):
+            self._insert(level, values)
+        self.count += other.count
+        self._compact()
+        return self
+
+    def quantiles(self, qs) -> np.ndarray:
+        if not self.count:
+            return np.full(len(qs), np.nan)
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], qs)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 1 << i) for i, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side='left')
+        return values[order][np.minimum(positions, len(values) - 1)]
+
+    def _insert(self, level: int, values: np.ndarray):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], values])
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) > self.k:
+                values = np.sort(values)
+                # An odd value out stays on its level so no weight is lost
+                odd = len(values) % 2
+                self.levels[level] = values[len(values) - odd:]
+                self._insert(level + 1, values[self._rng.integers(2):len(values) - odd:2])
+            level += 1
+
+
+class Moments:
+    """
+    Count, mean, variance, min and max of a stream of numbers, merged with
+    Chan et al.'s pairwise update so partitions combine exactly.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values: np.ndarray):
+        if len(values):
+            other = Moments()
+            other.count = len(values)
+            other.mean = float(values.mean())
+            other.m2 = float(((values - other.mean) ** 2).sum())
+            other.min = float(values.min())
+            other.max = float(values.max())
+            self.merge(other)
+        return self
+
+    def merge(self, other: 'Moments'):
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        return self
+
+    @property
+    def std(self) -> float:
+        # Sample standard deviation, as describe() reports
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+
+class ColumnProfile:
+    """
+    Null count, distinct count and, while every chunk of the column has been
+    numeric, moments and quantiles of one column.
+    """
+
+    def __init__(self, precision: int = 14, exact_limit: int = 4096, quantile_k: int = 1024):
+        self.dtypes = []
+        self.nulls = 0
+        self.distinct = DistinctCounter(precision, exact_limit)
+        self.moments = Moments()
+        self.quantiles = QuantileSketch(quantile_k)
+        self.numeric = True
+
+    def update(self, series: pd.Series, unique_hashes: np.ndarray, nulls: int):
+        self._add_dtype(str(series.dtype))
+        self.nulls += nulls
+        self.distinct.update(unique_hashes)
+        if self.numeric and not _is_numeric(series):
+            self._drop_numeric()
+        if self.numeric:
+            values = series.to_numpy(dtype='float64', na_value=np.nan)
+            values = values[~np.isnan(values)]
+            self.moments.update(values)
+            self.quantiles.update(values)
+        return self
+
+    def merge(self, other: 'ColumnProfile'):
+        for dtype in other.dtypes:
+            self._add_dtype(dtype)
+        self.nulls += other.nulls
+        self.distinct.merge(other.distinct)
+        if self.numeric and not other.numeric:
+            self._drop_numeric()
+        if self.numeric:
+            self.moments.merge(other.moments)
+            self.quantiles.merge(other.quantiles)
+        return self
+
+    @property
+    def dtype(self) -> str:
+        return '|'.join(self.dtypes)
+
+    def _add_dtype(self, dtype: str):
+        if dtype not in self.dtypes:
+            self.dtypes.append(dtype)
+
+    def _drop_numeric(self):
+        self.numeric = False
+        self.moments = None
+        self.quantiles = None
+
+
+class DatasetProfile:
+    """
+    The statistics view_dataset_summary prints, gathered in a single pass:
+    update() takes the dataset one chunk at a time and merge() combines
+    profiles of partitions, so neither needs the whole dataset in memory.
+
+    Null counts, min/max/mean/std are exact. Distinct counts are exact up to
+    ``exact_limit`` values per column and HyperLogLog estimates beyond it.
+    Duplicate rows are counted from 64-bit row hashes, exactly up to
+    ``duplicate_exact_limit`` distinct rows and estimated beyond it.
+    Quantiles come from a ``quantile_k`` sized compactor.
+    """
+
+    def __init__(self, precision: int = 14, exact_limit: int = 4096, duplicate_exact_limit: int = 2_000_000,
+                 quantile_k: int = 1024):
+        self.options = {'precision': precision, 'exact_limit': exact_limit, 'quantile_k': quantile_k}
+        self.rows = 0
+        self.columns = {}
+        self.distinct_rows = DistinctCounter(precision, duplicate_exact_limit)
+        self.head = None
+
+    def update(self, frame: pd.DataFrame):
+        if self.head is None:
+            self.head = frame.head()
+        self.rows += len(frame)
+        row_hashes = np.full(len(frame), 0x345678, dtype=np.uint64)
+        multiplier = np.uint64(1000003)
+        for position, col in enumerate(frame.columns):
+            series = frame[col]
+            hashes, unique_hashes, nulls = hash_column(series)
+            self._column(col).update(series, unique_hashes, nulls)
+            # Order-dependent combination of the column hashes into row hashes
+            row_hashes = (row_hashes ^ hashes) * multiplier
+            multiplier += np.uint64(82520 + 2 * (len(frame.columns) - position))
+        self.distinct_rows.update(row_hashes)
+        return self
+
+    def merge(self, other: 'DatasetProfile'):
+        if self.head is None:
+            self.head = other.head
+        self.rows += other.rows
+        for col, column in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(column)
+            else:
+                self.columns[col] = column
+        self.distinct_rows.merge(other.distinct_rows)
+        return self
+
+    def _column(self, col) -> ColumnProfile:
+        if col not in self.columns:
+            self.columns[col] = ColumnProfile(**self.options)
+        return self.columns[col]
+
+    @property
+    def duplicates(self) -> int:
+        return max(self.rows - self.distinct_rows.count(), 0)
+
+    def dtypes(self) -> pd.Series:
+        return pd.Series({col: column.dtype for col, column in self.columns.items()}, dtype=object)
+
+    def nunique(self) -> pd.Series:
+        return pd.Series({col: column.distinct.count() for col, column in self.columns.items()}, dtype='int64')
+
+    def missing_values(self) -> pd.Series:
+        return pd.Series({col: column.nulls for col, column in self.columns.items()}, dtype='int64')
+
+    def describe(self) -> pd.DataFrame:
+        """
+        describe() of the numerical columns, with approximate percentiles.
+        """
+        index = ['count', 'mean', 'std', 'min'] + [f'{q:.0%}' for q in DESCRIBE_PERCENTILES] + ['max']
+        summary = {}
+        for col, column in self.columns.items():
+            if not column.numeric:
+                continue
+            moments = column.moments
+            mean = moments.mean if moments.count else np.nan
+            percentiles = column.quantiles.quantiles(DESCRIBE_PERCENTILES).tolist()
+            summary[col] = [moments.count, mean, moments.std, moments.min] + percentiles + [moments.max]
+        return pd.DataFrame(summary, index=index, dtype=float)
+
+    def to_dict(self) -> dict:
+        nunique = self.nunique()
+        describe = self.describe()
+        columns = {}
+        for col, column in self.columns.items():
+            entry = {
+                'dtype': column.dtype,
+                'nulls': column.nulls,
+                'distinct': int(nunique[col]),
+                'distinct_exact': column.distinct.exact,
+            }
+            if col in describe.columns:
+                entry['summary'] = {stat: _json_number(value) for stat, value in describe[col].items()}
+            columns[str(col)] = entry
+        return {
+            'rows': self.rows,
+            'columns': len(self.columns),
+            'duplicate_rows': self.duplicates,
+            'duplicate_rows_exact': self.distinct_rows.exact,
+            'column_profiles': columns,
+        }
+
+
+def _json_number(value):
+    return None if pd.isna(value) else float(value)
+
+
+def _profile_chunk(chunk: pd.DataFrame, options: dict) -> DatasetProfile:
+    return DatasetProfile(**options).update(chunk)
+
+
+def _iter_chunks(source, chunk_size: int, columns: list = None):
+    if isinstance(source, pd.DataFrame):
+        frame = source if columns is None else source[columns]
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size]
+    else:
+        yield from iter_frame_chunks(source, chunk_size, columns)
+
+
+def profile_dataset(source, chunk_size: int = 100_000, n_workers: int = 1, columns: list = None,
+                    **options) -> DatasetProfile:
+    """
+    Profile a DataFrame, or a CSV/Parquet/Feather file read chunk by chunk,
+    in one pass. With ``n_workers > 1`` chunks are profiled in a process pool
+    and the partial profiles merged in order; at most two chunks per worker
+    are held in memory at a time. ``options`` are passed to DatasetProfile.
+    """
+    profile = DatasetProfile(**options)
+    chunks = _iter_chunks(source, chunk_size, columns)
+    if n_workers <= 1:
+        for chunk in chunks:
+            profile.update(chunk)
+        return profile
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_profile_chunk, chunk, options))
+            if len(pending) >= 2 * n_workers:
+                profile.merge(pending.popleft().result())
+        while pending:
+            profile.merge(pending.popleft().result())
+    return profile
+
+
+def draw_missing_values(ax, missing_values: pd.Series):
+    """
+    Horizontal bar chart of the columns with missing values, largest first.
+    """
+    missing_values = missing_values[missing_values > 0].sort_values(ascending=False)
+    bars = ax.barh(missing_values.index, missing_values.values, color='skyblue')
+    ax.set_title('Missing Values per Column')
+    ax.set_xlabel('Number of Missing Values')
+    ax.set_ylabel('Columns')
+    ax.invert_yaxis()  # Invert y-axis for better readability
+
+    # Annotate bars with the exact numbers
+    for bar in bars:
+        ax.text(bar.get_width() + 0.5, bar.get_y() + bar.get_height() / 2, f'{int(bar.get_width())}', va='center')
+
+
+def write_report(profile: DatasetProfile, report_dir: str) -> dict:
+    """
+    Write the profile as ``profile.json`` and its missing values chart as
+    ``missing_values.png`` to ``report_dir``. Rendering does not go through
+    pyplot, so it needs no display and never blocks.
+    """
+    from matplotlib.figure import Figure
+
+    os.makedirs(report_dir, exist_ok=True)
+    paths = {'json': os.path.join(report_dir, 'profile.json'), 'png': os.path.join(report_dir, 'missing_values.png')}
+    with open(paths['json'], 'w') as f:
+        json.dump(profile.to_dict(), f, indent=2)
+
+    figure = Figure(figsize=(10, 6))
+    draw_missing_values(figure.add_subplot(), profile.missing_values())
+    figure.tight_layout()
+    figure.savefig(paths['png'])
+    return paths
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Profile a dataset in one chunked pass and write a report')
+    parser.add_argument('--data-path', type=str, required=True, help='CSV, Parquet or Feather file to profile')
+    parser.add_argument('--report-dir', type=str, default='eda_report', help='Directory to write the report to')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='Rows read and profiled at a time')
+    parser.add_argument('--workers', type=int, default=1, help='Processes profiling chunks in parallel')
+    parser.add_argument('--precision', type=int, default=14, help='HyperLogLog precision for distinct counts')
+    parser.add_argument('--exact-limit', type=int, default=4096,
+                        help='Distinct values per column counted exactly before switching to HyperLogLog')
+    parser.add_argument('--duplicate-exact-limit', type=int, default=2_000_000,
+                        help='Distinct rows counted exactly before duplicates are estimated')
+    parser.add_argument('--quantile-k', type=int, default=1024, help='Size of the quantile sketch compactors')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    profile = profile_dataset(
+        args.data_path, chunk_size=args.chunk_size, n_workers=args.workers, precision=args.precision,
+        exact_limit=args.exact_limit, duplicate_exact_limit=args.duplicate_exact_limit, quantile_k=args.quantile_k,
+    )
+    paths = write_report(profile, args.report_dir)
+    print(f'Profiled {profile.rows} rows and {len(profile.columns)} columns in {time.perf_counter() - start:.2f}s')
+    print(f"Report written to {paths['json']} and {paths['png']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+
+SEARCH_METHODS = ('random', 'halving')
+
+DEFAULT_SEARCH_SPACE = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 8, 12, 16, 24],
+    'max_features': [1.0, 'sqrt', 0.5],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 5, 10],
+}
+
+# Arrays shared by every trial of a worker process, memory mapped from disk
+_shared = {}
+
+
+def load_search_space(path: str = None) -> dict:
+    """
+    Search space as ``{param: [candidate values]}`` from a JSON file, or the default.
+    """
+    if path is None:
+        return DEFAULT_SEARCH_SPACE
+    with open(path) as f:
+        return json.load(f)
+
+
+def sample_configs(space: dict, n_configs: int, seed: int = 0) -> list:
+    """
+    ``n_configs`` distinct random configurations (fewer if the space is smaller).
+    """
+    rng = random.Random(seed)
+    n_configs = min(n_configs, math.prod(len(values) for values in space.values()))
+    configs, seen = [], set()
+    while len(configs) < n_configs:
+        config = {param: rng.choice(values) for param, values in space.items()}
+        key = json.dumps(config, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def _init_worker(data_dir: str):
+    for name in ('X_train', 'y_train', 'X_val', 'y_val'):
+        # Copy-on-write mapping: pages are still shared between workers, but the
+        # arrays count as writeable, which some sklearn Cython checks require
+        _shared[name] = np.load(os.path.join(data_dir, f'{name}.npy'), mmap_mode='c')
+
+
+def _run_trial(trial_id: int, params: dict, n_rows: int, max_trees: int, seed: int) -> dict:
+    """
+    Fit one configuration on the first ``n_rows`` (pre-shuffled) training
+    rows, with at most ``max_trees`` trees, and score it on the validation set.
+    """
+    trial_params = dict(params)
+    trial_params['n_estimators'] = min(params.get('n_estimators', 100), max_trees)
+    X_train, y_train = _shared['X_train'][:n_rows], _shared['y_train'][:n_rows]
+
+    start = time.perf_counter()
+    model = RandomForestRegressor(random_state=seed, n_jobs=1, **trial_params)
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    preds = model.predict(_shared['X_val'])
+    return {
+        'trial': trial_id,
+        'params': params,
+        'rows': int(n_rows),
+        'trees': trial_params['n_estimators'],
+        'r2': float(r2_score(_shared['y_val'], preds)),
+        'mse': float(mean_squared_error(_shared['y_val'], preds)),
+        'fit_seconds': round(fit_seconds, 3),
+    }
+
+
+class HyperparameterSearch:
+    """
+    Random or successive-halving search over RandomForestRegressor settings,
+    scored by validation R2. Trials run in a process pool; the training and
+    validation matrices are written once as .npy files and memory mapped by
+    every worker, so they are never pickled per trial.
+
+    Every trial is capped at ``max_trial_trees`` trees. Successive halving
+    also starts each configuration on a fraction of the rows and only gives
+    the best ``1 / factor`` of them more, stopping poor configurations early.
+    """
+
+    def __init__(self, space: dict = None, method: str = 'random', n_trials: int = 20, n_workers: int = None,
+                 factor: int = 3, max_trial_trees: int = 200, min_rows: int = 1000, seed: int = 42):
+        if method not in SEARCH_METHODS:
+            raise ValueError(f"Unknown search method '{method}', expected one of {SEARCH_METHODS}")
+        if factor < 2:
+            raise ValueError(f"Halving factor must be at least 2, got {factor}")
+        self.space = space or DEFAULT_SEARCH_SPACE
+        self.method = method
+        self.n_trials = n_trials
+        self.n_workers = n_workers or os.cpu_count()
+        self.factor = factor
+        self.max_trial_trees = max_trial_trees
+        self.min_rows = min_rows
+        self.seed = seed
+        self.leaderboard = []
+
+    def run(self, X_train, y_train, X_val, y_val) -> dict:
+        """
+        Search, fill ``leaderboard`` (best first) and return the best parameters.
+        """
+        # Shuffle once, so any prefix of the rows is a random subsample for halving
+        order = np.random.RandomState(self.seed).permutation(len(X_train))
+        data_dir = tempfile.mkdtemp(prefix='hpsearch-')
+        try:
+            arrays = {
+                'X_train': np.asarray(X_train, dtype=np.float32)[order],
+                'y_train': np.asarray(y_train, dtype=np.float64)[order],
+                # Trees compare float32 features, so this is what they would see anyway
+                'X_val': np.asarray(X_val, dtype=np.float32),
+                'y_val': np.asarray(y_val, dtype=np.float64),
+            }
+            for name, array in arrays.items():
+                np.save(os.path.join(data_dir, f'{name}.npy'), np.ascontiguousarray(array))
+            del arrays
+
+            with ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                     initargs=(data_dir,)) as pool:
+                if self.method == 'random':
+                    results = self._random(pool, len(order))
+                else:
+                    results = self._halving(pool, len(order))
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+        # Configurations that got further in halving rank first, then by validation R2
+        self.leaderboard = sorted(results, key=lambda result: (result['round'], result['r2']), reverse=True)
+        return self.best_params
+
+    @property
+    def best_params(self) -> dict:
+        return self.leaderboard[0]['params'] if self.leaderboard else {}
+
+    def _run_round(self, pool, trials: list, n_rows: int, round_id: int = 0) -> list:
+        futures = [
+            pool.submit(_run_trial, trial_id, params, n_rows, self.max_trial_trees, self.seed)
+            for trial_id, params in trials
+        ]
+        results = []
+        for future in futures:
+            result = future.result()
+            result['round'] = round_id
+            results.append(result)
+            print(f"Trial {result['trial']} ({result['rows']} rows): R2 {result['r2']:.4f} {result['params']}")
+        return results
+
+    def _random(self, pool, n_rows: int) -> list:
+        configs = sample_configs(self.space, self.n_trials, self.seed)
+        return self._run_round(pool, list(enumerate(configs)), n_rows)
+
+    def _halving(self, pool, n_rows: int) -> list:
+        trials = list(enumerate(sample_configs(self.space, self.n_trials, self.seed)))
+        # One round per power of factor up to the number of trials; counted in
+        # integers, as math.log(1000, 10) is just below 3
+        n_rounds, reach = 1, self.factor
+        while reach <= len(trials):
+            n_rounds += 1
+            reach *= self.factor
+        rows = max(self.min_rows, n_rows // self.factor ** (n_rounds - 1))
+
+        results = []
+        for round_id in range(n_rounds):
+            rows = min(rows, n_rows)
+            print(f"Halving round {round_id}: {len(trials)} configurations on {rows} rows")
+            round_results = self._run_round(pool, trials, rows, round_id)
+            results.extend(round_results)
+            if len(trials) <= 1 or round_id == n_rounds - 1:
+                break
+            # Only the best 1/factor of the configurations earn more rows
+            survivors = sorted(round_results, key=lambda result: result['r2'], reverse=True)
+            survivors = survivors[:max(1, len(trials) // self.factor)]
+            kept = {result['trial'] for result in survivors}
+            trials = [(trial_id, params) for trial_id, params in trials if trial_id in kept]
+            rows *= self.factor
+
+        # A configuration's standing is its result on the most rows it was given
+        final = {}
+        for result in results:
+            final[result['trial']] = result
+        return list(final.values())
+
+    def save_leaderboard(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({'method': self.method, 'best_params': self.best_params,
+                       'leaderboard': self.leaderboard}, f, indent=2)
@@ -1,110 +1,316 @@
 import sys
 import argparse
+import math
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
 import os
-import tempfile
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pipeline.pipeline_builder import PipelineBuilder
+from pipeline.step_records import LOG_LEVELS
+from data_io import FORMATS, FrameWriter, write_frame
+from dataset_cache import AzureMLBackend, DatasetCache, LocalBackend
 
 sys.dont_write_bytecode = True
 pd.set_option('display.max_columns', None)
 
+PIPELINE_FILENAME = 'pipeline.joblib'
+DEFAULT_DATASET_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'itsm-datasets')
+
+# Heavier optional dependencies (scikit-learn, joblib, dotenv) are not
+# imported at module level either, so the component starts quickly.
+#
 # Avoid importing Azure ML SDK at module import time. Components running on
 # Azure ML receive inputs as mounted files, so the SDK is not required for
 # typical preprocessing. If a dataset name (not a mounted path) is provided,
 # the loader will perform a lazy SDK import.
 
 
+DEFAULT_STEPS = [
+    'CleanDataStep',
+    'FeatureEngineeringStep',
+    'CategoricalEncodeStep',
+    'NormalisationStep',
+]
+
+
 def main():
     args = parse_arguments()
 
+    # Azure settings (e.g. for the dataset cache) may come from a .env file
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Define the pipeline steps, from a YAML/JSON spec if given (see pipeline.registry)
+    if args.pipeline_spec:
+        from pipeline.registry import load_pipeline_spec
+        steps_list = load_pipeline_spec(args.pipeline_spec)
+    else:
+        steps_list = list(DEFAULT_STEPS)
+    if args.optimise_memory:
+        # Compact dtypes right after cleaning so every later step works on the smaller frame
+        names = [step if isinstance(step, str) else step['name'] for step in steps_list]
+        position = names.index('CleanDataStep') + 1 if 'CleanDataStep' in names else 0
+        steps_list.insert(position, 'MemoryOptimiseStep')
+
+    # Build the pipeline, partitioned over a process pool if requested
+    executor = None
+    if args.workers > 1:
+        from pipeline.executor import ParallelExecutor
+        executor = ParallelExecutor(n_workers=args.workers, partition_size=args.partition_size)
+
+    # Optionally reuse cached step outputs from earlier runs on the same data
+    cache = None
+    if args.cache_dir:
+        from pipeline.step_cache import StepCache
+        cache = StepCache(args.cache_dir, max_bytes=int(args.cache_max_gb * 1024 ** 3))
+        if args.clear_cache:
+            cache.invalidate()
+
+    pipeline_builder = PipelineBuilder(
+        steps_list=steps_list,
+        executor=executor,
+        cache=cache,
+        log_level=args.log_level,
+        profile=args.profile,
+        inplace=args.inplace,
+        copy_budget=args.copy_budget,
+    )
+    data_pipeline = pipeline_builder.build_pipeline()
+
+    # Only read the raw columns some step needs, with the dtypes the steps expect
+    read_options = None
+    if not args.read_all_columns:
+        input_plan = pipeline_builder.plan_input()
+        read_options = {'usecols': input_plan['usecols'], 'dtype': input_plan['dtype']}
+        print('Columns not read (dropped before any step uses them):', input_plan['skipped_columns'])
+
+    # Dataset assets (not mounted paths) are fetched through a local cache
+    dataset_cache = None
+    if args.dataset_cache_dir or args.dataset_backend_dir:
+        dataset_cache = build_dataset_cache(args.dataset_cache_dir, args.dataset_backend_dir,
+                                            args.dataset_cache_max_gb, args.download_workers)
+
+    if args.chunk_size:
+        run_streaming(args, data_pipeline, dataset_cache, read_options)
+        return
+
     # Load the dataset from Azure ML
-    dataset = load_dataset_from_azure(args.data_path)
+    dataset = load_dataset_from_azure(args.data_path, dataset_cache, args.data_version, args.download_workers,
+                                      read_options)
     print('Loaded dataset from Azure ML:', args.data_path)
 
     # Split the dataset into train and test sets
-    train_data, test_data = train_test_split(dataset, test_size=0.2, random_state=42)
-
-    # Define the pipeline steps
-    steps_list = [
-        'CleanDataStep',
-        'FeatureEngineeringStep',
-        'CategoricalEncodeStep',
-        'NormalisationStep',
-    ]
-
-    # Build and execute the pipeline for train data
-    pipeline_builder = PipelineBuilder(steps_list=steps_list)
-    data_pipeline = pipeline_builder.build_pipeline()
+    train_data, test_data = split_train_test(dataset)
+    # The split holds its own copies of the rows, so the full frame can go
+    del dataset
 
-    processed_train_data = data_pipeline.execute(train_data)
-    processed_test_data = data_pipeline.execute(test_data)
+    # Fit the pipeline on train data, then reuse its statistics for test data
+    processed_train_data = data_pipeline.fit_transform(train_data)
+    processed_test_data = data_pipeline.transform(test_data)
 
     # Save to Azure ML output paths
-    # Ensure parent directories exist (Azure may provide a file path).
-    def _save_df(df, out_path):
-        parent = os.path.dirname(out_path)
-        if parent:
-            os.makedirs(parent, exist_ok=True)
-        df.to_csv(out_path, index=False)
-
-    _save_df(processed_train_data, args.train_output)
-    _save_df(processed_test_data, args.test_output)
+    write_frame(processed_train_data, args.train_output, fmt=args.output_format, compression=args.compression)
+    write_frame(processed_test_data, args.test_output, fmt=args.output_format, compression=args.compression)
+    print("Saved processed train and test datasets to output paths.")
+    _save_pipeline(data_pipeline, args.pipeline_output)
+    _save_profile(data_pipeline, args)
+
+
+def run_streaming(args, data_pipeline, dataset_cache=None, read_options=None):
+    """
+    Read the dataset in chunks of ``--chunk-size`` rows, so peak memory is
+    bounded by the chunk size rather than the dataset size.
+
+    Each chunk is split into train/test rows. The pipeline's statistics are
+    accumulated over the train rows of every chunk first, then a final pass
+    transforms both parts and appends them to the output paths.
+    """
+    def train_chunks():
+        for chunk in iter_dataset_chunks(args.data_path, args.chunk_size, dataset_cache, args.data_version,
+                                         read_options):
+            train_chunk, _ = _split_chunk(chunk)
+            yield train_chunk
+
+    data_pipeline.fit_stream(train_chunks)
+    print("Fitted pipeline over all train chunks.")
+
+    with FrameWriter(args.train_output, fmt=args.output_format, compression=args.compression) as train_writer, \
+            FrameWriter(args.test_output, fmt=args.output_format, compression=args.compression) as test_writer:
+        for chunk_number, chunk in enumerate(iter_dataset_chunks(args.data_path, args.chunk_size,
+                                                                     dataset_cache, args.data_version,
+                                                                     read_options)):
+            train_chunk, test_chunk = _split_chunk(chunk)
+            for part, writer in ((train_chunk, train_writer), (test_chunk, test_writer)):
+                if not part.empty:
+                    writer.write(data_pipeline.transform(part))
+            print(f"Processed chunk {chunk_number} ({len(chunk)} rows)")
+        # A part that got no rows at all is still written, with the other part's columns
+        train_writer.template = test_writer.template if train_writer.template is None else train_writer.template
+        test_writer.template = train_writer.template if test_writer.template is None else test_writer.template
+
     print("Saved processed train and test datasets to output paths.")
+    _save_pipeline(data_pipeline, args.pipeline_output)
+    _save_profile(data_pipeline, args)
+
+
+def _split_chunk(chunk):
+    # train_test_split needs at least one row on each side
+    if len(chunk) < 2:
+        return chunk, chunk.iloc[:0]
+    return split_train_test(chunk)
+
+
+def split_train_test(data: pd.DataFrame, test_size: float = 0.2, seed: int = 42):
+    """
+    The same rows as sklearn's ``train_test_split(data, test_size=test_size,
+    random_state=seed)``, without importing scikit-learn at startup.
+    """
+    n_test = math.ceil(test_size * len(data))
+    permutation = np.random.RandomState(seed).permutation(len(data))
+    return data.iloc[permutation[n_test:]], data.iloc[permutation[:n_test]]
+
+
+def _save_pipeline(data_pipeline, out_dir):
+    # The fitted pipeline travels with the model so serving reuses its statistics
+    if not out_dir:
+        return
+    os.makedirs(out_dir, exist_ok=True)
+    # Running in place is an option of this run; callers of the saved pipeline keep their frames
+    inplace = data_pipeline.inplace
+    data_pipeline.set_inplace(False)
+    data_pipeline.save(os.path.join(out_dir, PIPELINE_FILENAME))
+    data_pipeline.set_inplace(inplace)
+    print(f"Saved fitted pipeline to {out_dir}")
+
+
+def _save_profile(data_pipeline, args):
+    if not args.profile:
+        return
+    out_path = args.profile_output or os.path.join(os.path.dirname(args.train_output), 'pipeline_profile.json')
+    print(data_pipeline.profile_report(out_path))
+    print(f"Saved pipeline profile to {out_path}")
 
 
 def parse_arguments():
     parser = argparse.ArgumentParser()
     parser.add_argument('--data-path', type=str, required=True, help='Name of the Azure ML dataset')
+    parser.add_argument('--data-version', type=str, default='latest', help='Version of the Azure ML dataset')
+    parser.add_argument('--dataset-cache-dir', type=str, default=None,
+                        help='Local cache of downloaded dataset versions (default: $DATASET_CACHE_DIR or ~/.cache)')
+    parser.add_argument('--dataset-backend-dir', type=str, default=None,
+                        help='Read dataset assets from this <name>/<version>/ folder instead of Azure ML')
+    parser.add_argument('--dataset-cache-max-gb', type=float, default=50.0,
+                        help='Size bound of the dataset cache; least recently used versions are evicted')
+    parser.add_argument('--download-workers', type=int, default=8,
+                        help='Files of a folder dataset downloaded and read in parallel')
     parser.add_argument('--train-output', type=str, required=True, help='Output path for train data')
     parser.add_argument('--test-output', type=str, required=True, help='Output path for test data')
+    parser.add_argument('--pipeline-output', type=str, default=None,
+                        help='Output folder for the fitted preprocessing pipeline')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='Stream the dataset in chunks of this many rows instead of loading it whole')
+    parser.add_argument('--output-format', type=str, choices=FORMATS, default='csv',
+                        help='Format of the processed train/test outputs')
+    parser.add_argument('--compression', type=str, default='default',
+                        help="Codec for parquet/feather outputs (e.g. snappy, zstd, lz4, or 'none')")
+    parser.add_argument('--log-level', type=str, choices=LOG_LEVELS, default='verbose',
+                        help="Step logging: 'verbose' previews, 'structured' JSON records per step, or 'quiet'")
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile every step (tracing allocations slows it down) and write a JSON report')
+    parser.add_argument('--profile-output', type=str, default=None,
+                        help='Path of the profile report (default: pipeline_profile.json beside --train-output)')
+    parser.add_argument('--optimise-memory', action='store_true',
+                        help='Convert repeated strings to categories and downcast numerics after cleaning')
+    parser.add_argument('--pipeline-spec', type=str, default=None,
+                        help='YAML/JSON file listing the pipeline steps (names or {name, params}) to run')
+    parser.add_argument('--read-all-columns', action='store_true',
+                        help='Read every raw column, even those the steps drop before using them')
+    parser.add_argument('--inplace', action='store_true',
+                        help='Let steps modify the loaded frame in place instead of copying it')
+    parser.add_argument('--copy-budget', type=float, default=None,
+                        help='Fail if the steps copy more than this multiple of the input frame in one run')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for partitioned pipeline execution (1 runs serially)')
+    parser.add_argument('--partition-size', type=int, default=None,
+                        help='Rows per partition when --workers > 1 (default: split evenly across workers)')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='Directory (e.g. a mounted datastore path) caching step outputs between runs')
+    parser.add_argument('--cache-max-gb', type=float, default=10.0,
+                        help='Size bound of the step cache; least recently used entries are evicted')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='Invalidate every cached step output before running')
     return parser.parse_args()
 
 
-def load_dataset_from_azure(dataset_name: str):
+def load_dataset_from_azure(dataset_name: str, cache: DatasetCache = None, version: str = 'latest',
+                            workers: int = 8, read_options: dict = None):
+    """
+    Load a dataset from Azure ML workspace. The CSV files of a folder asset
+    are read in parallel and concatenated in path order. ``read_options``
+    are passed to ``pd.read_csv`` (e.g. usecols/dtype from PipelineBuilder.plan_input).
+    """
+    paths = resolve_dataset_files(dataset_name, cache, version)
+    read_csv = functools.partial(pd.read_csv, **(read_options or {}))
+    if len(paths) == 1:
+        return read_csv(paths[0])
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return pd.concat(pool.map(read_csv, paths), ignore_index=True)
+
+
+def iter_dataset_chunks(dataset_name: str, chunk_size: int, cache: DatasetCache = None, version: str = 'latest',
+                        read_options: dict = None):
+    """
+    Iterate over a dataset from Azure ML workspace in DataFrame chunks of
+    at most ``chunk_size`` rows.
+    """
+    for path in resolve_dataset_files(dataset_name, cache, version):
+        yield from pd.read_csv(path, chunksize=chunk_size, **(read_options or {}))
+
+
+def resolve_dataset_files(dataset_name: str, cache: DatasetCache = None, version: str = 'latest') -> list:
     """
-    Load a dataset from Azure ML workspace.
+    Resolve a dataset name or mounted path to the readable CSV files of the dataset.
     """
     # If Azure ML mounts the input, `dataset_name` will be a local path - read it.
-    if os.path.exists(dataset_name):
-        return pd.read_csv(dataset_name)
-
-    # Otherwise attempt a lazy import of the Azure ML SDK. If it's not
-    # available or credentials are not configured, raise a clear error.
-    try:
-        from azure.ai.ml import MLClient
-        from azure.identity import DefaultAzureCredential
-    except Exception:
-        raise RuntimeError(
-            "Azure ML SDK not available in this environment. Either pass the dataset "
-            "as a mounted input file (recommended) or run in an environment that has "
-            "the 'azure-ai-ml' and 'azure-identity' packages installed and configured."
+    if os.path.isfile(dataset_name):
+        return [dataset_name]
+    if os.path.isdir(dataset_name):
+        paths = sorted(
+            os.path.join(root, f) for root, _, files in os.walk(dataset_name) for f in files
         )
+    else:
+        # Otherwise fetch the asset through the local dataset cache
+        paths = (cache or default_dataset_cache()).fetch(dataset_name, version)
+
+    paths = [path for path in paths if path.lower().endswith(".csv")]
+    if not paths:
+        raise RuntimeError(f"Could not locate a CSV file for dataset '{dataset_name}'")
+    return paths
+
+
+def build_dataset_cache(cache_dir: str = None, backend_dir: str = None, max_gb: float = 50.0,
+                        workers: int = 8) -> DatasetCache:
+    """
+    Dataset cache over the Azure ML workspace, or over ``backend_dir``
+    (laid out as <name>/<version>/...) as a local stand-in.
+    """
+    if backend_dir:
+        backend = LocalBackend(backend_dir)
+    else:
+        backend = AzureMLBackend(
+            subscription_id=os.environ.get("AZURE_SUBSCRIPTION_ID", "your_subscription_id"),
+            resource_group_name=os.environ.get("AZURE_RESOURCE_GROUP", "your_resource_group_name"),
+            workspace_name=os.environ.get("AZURE_WORKSPACE_NAME", "your_workspace_name"),
+        )
+    cache_dir = cache_dir or os.environ.get("DATASET_CACHE_DIR") or DEFAULT_DATASET_CACHE_DIR
+    return DatasetCache(cache_dir, backend, max_bytes=int(max_gb * 1024 ** 3), workers=workers)
 
-    ml_client = MLClient(
-        DefaultAzureCredential(),
-        subscription_id="your_subscription_id",
-        resource_group_name="your_resource_group_name",
-        workspace_name="your_workspace_name",
-    )
 
-    dataset = ml_client.data.get(name=dataset_name, version="latest")
-    # Try reading via dataset.path if available
-    if hasattr(dataset, "path") and dataset.path:
-        try:
-            return pd.read_csv(dataset.path)
-        except Exception:
-            pass
-
-    # Fallback: download dataset to a temp dir and read the first CSV found
-    local_dir = tempfile.mkdtemp()
-    ml_client.data.download(name=dataset_name, download_path=local_dir, version="latest")
-    for root, _, files in os.walk(local_dir):
-        for f in files:
-            if f.lower().endswith(".csv"):
-                return pd.read_csv(os.path.join(root, f))
-
-    raise RuntimeError(f"Could not locate a CSV file for dataset '{dataset_name}'")
+@functools.lru_cache(maxsize=None)
+def default_dataset_cache() -> DatasetCache:
+    # One cache (and so one MLClient) per process
+    return build_dataset_cache()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,154 @@
+import json
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+# Markers sklearn uses for leaf nodes in Tree.nodes
+_TREE_LEAF = -1
+_TREE_UNDEFINED = -2
+
+QUANTISE_DTYPES = ('float32', 'float16')
+
+
+def save_artifact(model, path: str, compress: int = 0):
+    """
+    Save a model with joblib. Uncompressed artifacts (``compress=0``) keep
+    their arrays raw in the file, so load_artifact can memory map them;
+    levels 1-9 trade load time for a smaller upload.
+    """
+    joblib.dump(model, path, compress=compress)
+
+
+def load_artifact(path: str, mmap: bool = True):
+    """
+    Load a model saved by save_artifact (or a plain joblib.dump), memory
+    mapping its arrays when the file is uncompressed.
+    """
+    if not mmap:
+        return joblib.load(path)
+    with warnings.catch_warnings():
+        # Compressed files cannot be mapped; joblib falls back to a normal load
+        warnings.simplefilter('ignore', UserWarning)
+        return joblib.load(path, mmap_mode='r')
+
+
+def prune_forest(model, max_depth: int):
+    """
+    Cut every tree of a fitted forest back to ``max_depth``. Nodes at that
+    depth become leaves predicting the mean their subtree was fitted on,
+    which sklearn already stores for every node.
+    """
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        if tree.max_depth > max_depth:
+            estimator.tree_ = _prune_tree(tree, max_depth)
+    return model
+
+
+def _prune_tree(tree, max_depth: int):
+    tree_class, args, state = tree.__reduce__()
+    nodes, values = state['nodes'], state['values']
+
+    # Breadth-first over the nodes that survive, renumbering them in visit order
+    keep, depths = [0], [0]
+    new_ids = {0: 0}
+    position = 0
+    while position < len(keep):
+        node, depth = keep[position], depths[position]
+        if depth < max_depth and nodes['left_child'][node] != _TREE_LEAF:
+            for child in (int(nodes['left_child'][node]), int(nodes['right_child'][node])):
+                new_ids[child] = len(keep)
+                keep.append(child)
+                depths.append(depth + 1)
+        position += 1
+
+    pruned = nodes[keep].copy()
+    for position, node in enumerate(keep):
+        if depths[position] < max_depth and nodes['left_child'][node] != _TREE_LEAF:
+            pruned['left_child'][position] = new_ids[int(nodes['left_child'][node])]
+            pruned['right_child'][position] = new_ids[int(nodes['right_child'][node])]
+        else:
+            pruned['left_child'][position] = _TREE_LEAF
+            pruned['right_child'][position] = _TREE_LEAF
+            pruned['feature'][position] = _TREE_UNDEFINED
+            pruned['threshold'][position] = _TREE_UNDEFINED
+
+    state = dict(state, nodes=pruned, values=np.ascontiguousarray(values[keep]),
+                 node_count=len(keep), max_depth=max(depths))
+    new_tree = tree_class(*args)
+    new_tree.__setstate__(state)
+    return new_tree
+
+
+def quantise_leaf_values(model, dtype: str = 'float16') -> str:
+    """
+    Round every node value of a fitted forest to ``dtype`` precision. sklearn
+    keeps values as float64, so this only shrinks compressed artifacts, where
+    the rounded values compress far better.
+
+    float16 keeps about 3 significant digits and values up to 65504, float32
+    about 7 digits. When the values exceed ``dtype``'s range the next wider
+    dtype that holds them is used instead (or the values are left as they
+    are). Returns the dtype the values were rounded to, or None.
+    """
+    largest = max(float(np.abs(estimator.tree_.value).max()) for estimator in model.estimators_)
+    candidates = QUANTISE_DTYPES[QUANTISE_DTYPES.index(dtype)::-1]
+    fitting = [candidate for candidate in candidates if largest <= float(np.finfo(candidate).max)]
+    if not fitting:
+        print(f"Tree values up to {largest:g} do not fit {dtype} or any wider quantised dtype; left as float64.")
+        return None
+    if fitting[0] != dtype:
+        print(f"Tree values up to {largest:g} exceed the {dtype} range; quantising to {fitting[0]} instead.")
+    dtype = fitting[0]
+
+    for estimator in model.estimators_:
+        tree_class, args, state = estimator.tree_.__reduce__()
+        state = dict(state, values=state['values'].astype(dtype).astype(np.float64))
+        new_tree = tree_class(*args)
+        new_tree.__setstate__(state)
+        estimator.tree_ = new_tree
+    return dtype
+
+
+def artifact_report(path: str, X_sample, mmap: bool = True, repeat: int = 20, batch_size: int = 1000) -> dict:
+    """
+    Size of a saved artifact, how long it takes to load, and its median
+    single-row and batch predict latency on ``X_sample``.
+    """
+    start = time.perf_counter()
+    model = load_artifact(path, mmap=mmap)
+    load_seconds = time.perf_counter() - start
+
+    single_row = X_sample.iloc[:1]
+    batch = X_sample.iloc[:batch_size]
+    single_row_seconds, batch_seconds = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.predict(single_row)
+        single_row_seconds.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        model.predict(batch)
+        batch_seconds.append(time.perf_counter() - start)
+
+    estimators = getattr(model, 'estimators_', [])
+    return {
+        'artifact_bytes': os.path.getsize(path),
+        'n_estimators': len(estimators),
+        'total_nodes': int(sum(estimator.tree_.node_count for estimator in estimators)),
+        'load_seconds': round(load_seconds, 4),
+        'memory_mapped': mmap,
+        'predict_single_row_ms': round(float(np.median(single_row_seconds)) * 1000, 3),
+        'predict_batch_ms': round(float(np.median(batch_seconds)) * 1000, 3),
+        'batch_rows': len(batch),
+    }
+
+
+def write_report(report: dict, path: str):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
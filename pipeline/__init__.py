@@ -1,7 +1,18 @@
-from pipeline.pipeline import Pipeline
-from pipeline.pipeline_builder import PipelineBuilder
+import importlib
+
+# Imported on first access, so `import pipeline` stays cheap
+_LAZY_ATTRIBUTES = {
+    'Pipeline': 'pipeline.pipeline',
+    'PipelineBuilder': 'pipeline.pipeline_builder',
+}
 
 __all__ = [
     'Pipeline',
     'PipelineBuilder',
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
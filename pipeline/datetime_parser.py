@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+_PANDAS_MAJOR = int(pd.__version__.split(".")[0])
+# What a Series of parsed (naive) timestamps comes out as, as the original
+# row-by-row apply produced it: datetime64[us] on pandas 3, [ns] before
+_DATETIME_DTYPE = pd.Series([pd.Timestamp("2000-01-01 00:00")]).dtype
+
+
+class DateTimeParser:
+    """
+    Column-level parser for the mixed date formats found in the ITSM extracts.
+
+    Each known format is tried over all the distinct values of a column at
+    once; only values a format could not parse are passed on to the next one,
+    and whatever is left falls back to ``pd.to_datetime(errors='coerce')``.
+    Parsed values are cached across columns and calls, so timestamps that
+    repeat (within a column or between Open/Close times) are parsed once.
+    """
+
+    DEFAULT_FORMATS = ("%d/%m/%Y %H:%M", "%d-%m-%Y %H:%M", "%m/%d/%Y %H:%M")
+    FALLBACK = "coerce"
+
+    def __init__(self, formats=DEFAULT_FORMATS, max_cache_size: int = 1_000_000):
+        self.formats = tuple(formats)
+        self.max_cache_size = max_cache_size
+        self.cache = {}
+        self.hit_counts = {}
+        self.cache_hits = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hit_counts = {fmt: 0 for fmt in self.formats + (self.FALLBACK,)}
+        self.cache_hits = 0
+
+    def parse(self, series: pd.Series) -> pd.Series:
+        """
+        Parse a Series of date strings, matching the row-by-row behaviour of
+        trying each format in turn with ``pd.to_datetime(x, format=fmt)``.
+        """
+        not_null = series.notna().to_numpy()
+        values = series[not_null]
+        if values.empty:
+            return pd.Series(pd.NaT, index=series.index, dtype=_DATETIME_DTYPE)
+
+        uniques = pd.unique(values.to_numpy(dtype=object))
+        unique_codes = pd.Index(uniques).get_indexer(values)
+        row_counts = np.bincount(unique_codes, minlength=len(uniques))
+
+        # A full cache is replaced rather than cleared, so a parse running
+        # concurrently keeps its own (local) reference intact
+        cache = self.cache
+        pending = [value for value in uniques if value not in cache]
+        if len(cache) + len(pending) > self.max_cache_size:
+            cache = self.cache = {}
+            pending = list(uniques)
+        self.cache_hits += len(uniques) - len(pending)
+
+        for fmt in self.formats:
+            if not pending:
+                break
+            parsed = pd.to_datetime(pd.Series(pending, dtype=object), format=fmt, errors="coerce")
+            unparsed = []
+            for value, timestamp in zip(pending, parsed):
+                if pd.isna(timestamp):
+                    unparsed.append(value)
+                else:
+                    cache[value] = (timestamp, fmt)
+            pending = unparsed
+
+        # Leftovers need the format inferred per value, exactly as the original
+        # scalar fallback did ('mixed' on pandas 2, the default on pandas 1).
+        if pending:
+            fallback_kwargs = {"format": "mixed"} if _PANDAS_MAJOR >= 2 else {}
+            try:
+                parsed = pd.to_datetime(pd.Series(pending, dtype=object), errors="coerce", **fallback_kwargs)
+                if parsed.dtype == object:
+                    raise ValueError("Mixed timezones")
+            except ValueError:
+                # Mixed tz-aware and naive values: one at a time, like the original
+                parsed = [pd.to_datetime(value, errors="coerce") for value in pending]
+            for value, timestamp in zip(pending, parsed):
+                cache[value] = (timestamp, self.FALLBACK)
+
+        parsed_uniques = []
+        for value, count in zip(uniques, row_counts):
+            timestamp, source = cache[value]
+            self.hit_counts[source] += int(count)
+            parsed_uniques.append(timestamp)
+
+        # Missing values take the trailing NaT
+        codes = np.full(len(series), len(uniques))
+        codes[not_null] = unique_codes
+        parsed_uniques = pd.Series(parsed_uniques + [pd.NaT])
+        if parsed_uniques.dtype.kind == "M" and getattr(parsed_uniques.dtype, "tz", None) is None:
+            parsed_uniques = parsed_uniques.astype(_DATETIME_DTYPE)
+        result = parsed_uniques.iloc[codes]
+        result.index = series.index
+        return result
+
+    def report(self) -> dict:
+        """
+        Rows resolved by each format (plus the coerce fallback) and the number
+        of distinct values served from the cache since the last reset.
+        """
+        return {"format_hits": dict(self.hit_counts), "cache_hits": self.cache_hits}
+
+    def __getstate__(self):
+        # The cache can hold millions of entries; never ship it with a pickled step.
+        state = self.__dict__.copy()
+        state["cache"] = {}
+        state["hit_counts"] = {fmt: 0 for fmt in self.formats + (self.FALLBACK,)}
+        state["cache_hits"] = 0
+        return state
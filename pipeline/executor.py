@@ -0,0 +1,83 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+
+from pipeline.step_records import merge_records, run_step
+
+
+def _transform_partition(steps, partition, profile=False):
+    records = []
+    for step in steps:
+        partition, record = run_step(step, partition, profile=profile)
+        records.append(record)
+    return partition, records
+
+
+def _transform_and_fit_partition(steps, step_to_fit, partition, profile=False):
+    partition, records = _transform_partition(steps, partition, profile)
+    step_to_fit.partial_fit(partition)
+    return partition, records, step_to_fit
+
+
+class ParallelExecutor:
+    """
+    Runs the row-local work of pipeline steps over partitions of a DataFrame
+    in a process pool.
+
+    Partitions are contiguous row ranges and results are concatenated in
+    partition order, so the output matches a serial run row for row. Stateful
+    steps are fitted per partition and their statistics merged.
+    """
+
+    def __init__(self, n_workers: int = None, partition_size: int = None):
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.partition_size = partition_size
+
+    def split(self, data: pd.DataFrame) -> list:
+        partition_size = self.partition_size or math.ceil(len(data) / self.n_workers) or 1
+        return [data.iloc[start:start + partition_size] for start in range(0, max(len(data), 1), partition_size)]
+
+    def transform(self, steps, partitions: list, profile: bool = False):
+        """
+        Apply the (fitted) steps to every partition. Returns the transformed
+        partitions and one record per step, merged over the partitions
+        (profiled in the workers if ``profile``).
+        """
+        if not steps:
+            return partitions, []
+        with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+            results = list(pool.map(_transform_partition, repeat(steps), partitions, repeat(profile)))
+        return [partition for partition, _ in results], self._merge_records([records for _, records in results])
+
+    def transform_and_fit(self, steps, step_to_fit, partitions: list, profile: bool = False):
+        """
+        Apply the (fitted) steps to every partition, then fit ``step_to_fit``
+        on each transformed partition and merge the per-partition statistics
+        into it. Returns the transformed partitions and the step records.
+        """
+        # Each worker receives its own pickled copy of the reset step
+        step_to_fit.reset()
+        with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+            results = list(pool.map(
+                _transform_and_fit_partition, repeat(steps), repeat(step_to_fit), partitions, repeat(profile)
+            ))
+        for _, _, fitted_step in results:
+            step_to_fit.merge(fitted_step)
+        return [partition for partition, _, _ in results], self._merge_records([records for _, records, _ in results])
+
+    @staticmethod
+    def _merge_records(partition_records: list) -> list:
+        merged = partition_records[0]
+        for records in partition_records[1:]:
+            merged = [merge_records(left, right) for left, right in zip(merged, records)]
+        return merged
+
+    @staticmethod
+    def combine(partitions: list) -> pd.DataFrame:
+        return pd.concat(partitions)
+
+    def __repr__(self):
+        return f'ParallelExecutor(n_workers={self.n_workers}, partition_size={self.partition_size})'
@@ -1,15 +1,263 @@
+from pipeline.profiler import frame_bytes, summary_table, write_report
+from pipeline.step_records import LOG_LEVELS, emit_record, run_step
 from pipeline.steps.pipeline_step import PipelineStep
 
 class Pipeline:
-    def __init__(self):
+    # Class-level defaults, so pipelines saved before these options existed still load
+    inplace = False
+    copy_budget = None
+    keep_records = True
+
+    def __init__(self, executor: 'ParallelExecutor' = None, cache: 'StepCache' = None, log_level: str = 'verbose',
+                 profile: bool = False, inplace: bool = False, copy_budget: float = None, keep_records: bool = True):
         self.steps = []
+        self.is_fitted = False
+        # Optional backend running the steps over partitions in a process pool
+        self.executor = executor
+        # Optional on-disk cache of step outputs, reused by in-memory runs
+        self.cache = cache
+        # Records of every step run, in order; a long-running server turns
+        # keep_records off so they are dropped once each run is checked
+        self.records = []
+        self.keep_records = keep_records
+        # Add wall/CPU time, heap usage and frame sizes to the records
+        self.profile = profile
+        self.log_level = 'verbose'
+        self.set_log_level(log_level)
+        # Let the steps modify the frame they are given instead of copying it:
+        # the pipeline owns the input, and the caller's frame is changed
+        self.inplace = inplace
+        # Most bytes the steps may copy in one run, as a multiple of the input
+        # frame's size; a run copying more raises once it finishes
+        self.copy_budget = copy_budget
+        # Frame copies made by the steps in the last run
+        self.copy_report = {}
         
     def add_step(self, pipeline_step: PipelineStep):
+        pipeline_step.log_level = self.log_level
+        pipeline_step.inplace = self.inplace
         self.steps.append(pipeline_step)
-        
-    # TODO: We might want to use batch processing here - not feed whole dataset
+        self.is_fitted = False
+
+    def set_log_level(self, log_level: str):
+        """
+        Set the log level of the pipeline and all of its steps (see LOG_LEVELS).
+        """
+        if log_level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level '{log_level}', expected one of {LOG_LEVELS}")
+        self.log_level = log_level
+        for step in self.steps:
+            step.log_level = log_level
+
+    def set_inplace(self, inplace: bool):
+        """
+        Switch the pipeline and all of its steps to (or from) running in place.
+        """
+        self.inplace = inplace
+        for step in self.steps:
+            step.inplace = inplace
+
+    def log(self, message: str):
+        if self.log_level == 'verbose':
+            print(message)
+
+    def fit(self, data):
+        """
+        Fit every step in turn, each on the output of the steps before it.
+        """
+        self.fit_transform(data)
+        return self
+
+    def fit_transform(self, data):
+        first_record, input_bytes = len(self.records), frame_bytes(data)
+        try:
+            if self.cache is not None:
+                data = self._run_cached(data, fit=True)
+            else:
+                data = self._fit_transform_steps(self.steps, data)
+            self.is_fitted = True
+            self._check_copies(input_bytes, self.records[first_record:])
+        finally:
+            self._drop_records(first_record)
+        return data
+
+    def transform(self, data):
+        """
+        Apply the fitted steps to new data (test, inference) without refitting.
+        """
+        if not self.is_fitted:
+            raise RuntimeError("Pipeline must be fitted before calling transform.")
+        first_record, input_bytes = len(self.records), frame_bytes(data)
+        try:
+            if self.cache is not None:
+                data = self._run_cached(data, fit=False)
+            else:
+                data = self._transform_steps(self.steps, data)
+            self._check_copies(input_bytes, self.records[first_record:])
+        finally:
+            self._drop_records(first_record)
+        return data
+
+    def _drop_records(self, first_record: int):
+        # Records of a run are only needed to check its copies unless kept
+        if not self.keep_records:
+            del self.records[first_record:]
+
+    def _check_copies(self, input_bytes: int, records: list):
+        # Steps count the copies they make in their records (see PipelineStep.copy_frame)
+        copies = sum(record.get('copies', 0) for record in records)
+        bytes_copied = sum(record.get('bytes_copied', 0) for record in records)
+        ratio = bytes_copied / input_bytes if input_bytes else 0.0
+        self.copy_report = {
+            'inplace': self.inplace,
+            'copies': copies,
+            'bytes_copied': bytes_copied,
+            'input_bytes': input_bytes,
+            'copy_ratio': round(ratio, 3),
+        }
+        self.log(f"Pipeline: {copies} frame copies, {bytes_copied / 1024 ** 2:.1f} MiB ({ratio:.2f}x the input)")
+        if self.copy_budget is not None and ratio > self.copy_budget:
+            raise RuntimeError(
+                f"Pipeline steps copied {ratio:.2f}x the input frame, over the copy budget of {self.copy_budget}x"
+            )
+
+    def fit_stream(self, make_chunks):
+        """
+        Fit the pipeline on a dataset too large to hold in memory.
+
+        ``make_chunks`` is called once per pass and must return a fresh
+        iterable of DataFrame chunks. Each stateful step accumulates its
+        statistics over one pass, with the chunks transformed by the (already
+        fitted) steps before it; stateless steps need no pass of their own.
+        """
+        for i, step in enumerate(self.steps):
+            if not step.stateful:
+                continue
+            step.reset()
+            for chunk in make_chunks():
+                step.partial_fit(self._transform_steps(self.steps[:i], chunk))
+        self.is_fitted = True
+        return self
+
+    def transform_stream(self, chunks):
+        """
+        Transform an iterable of DataFrame chunks with the fitted pipeline,
+        yielding each processed chunk in turn.
+        """
+        for chunk in chunks:
+            yield self.transform(chunk)
+
     def execute(self, data):
+        return self.fit_transform(data)
+
+    def _transform_steps(self, steps, data):
+        if self.executor is not None:
+            partitions, records = self.executor.transform(steps, self.executor.split(data), self.profile)
+            self._add_records(records)
+            return self.executor.combine(partitions)
+        for step in steps:
+            data, record = run_step(step, data, profile=self.profile)
+            self._add_records([record])
+        return data
+
+    def _fit_transform_steps(self, steps, data):
+        if self.executor is not None:
+            return self._fit_transform_partitioned(steps, data)
+        for step in steps:
+            data, record = run_step(step, data, fit=True, profile=self.profile)
+            self._add_records([record])
+        return data
+
+    def _add_records(self, records: list):
+        self.records.extend(records)
+        if self.log_level == 'structured':
+            for record in records:
+                emit_record(record)
+
+    def _fit_transform_partitioned(self, steps, data):
+        # Stateless steps are batched into one pass per stateful step: each
+        # pass transforms the partitions with the pending steps and fits the
+        # stateful step on the result, merging per-partition statistics.
+        partitions = self.executor.split(data)
+        pending_steps = []
+        for step in steps:
+            if step.stateful:
+                partitions, records = self.executor.transform_and_fit(pending_steps, step, partitions, self.profile)
+                self._add_records(records)
+                pending_steps = [step]
+            else:
+                pending_steps.append(step)
+        partitions, records = self.executor.transform(pending_steps, partitions, self.profile)
+        self._add_records(records)
+        return self.executor.combine(partitions)
+
+    def _run_cached(self, data, fit: bool):
+        # Keys chain from the input hash through every step, so they can all
+        # be computed up front and the longest cached prefix skipped
+        mode = 'fit' if fit else 'transform'
+        key = self.cache.hash_data(data)
+        keys = []
         for step in self.steps:
-            data = step.process(data)
+            if fit:
+                step.reset()
+            key = self.cache.step_key(key, step, mode)
+            keys.append(key)
+
+        # Resume after the last step with a cached output
+        cached_steps = len(self.steps)
+        while cached_steps > 0 and not self.cache.contains(self.steps[cached_steps - 1], keys[cached_steps - 1]):
+            cached_steps -= 1
+
+        if cached_steps:
+            data, steps = self.cache.load(self.steps[cached_steps - 1], keys[cached_steps - 1])
+            if fit:
+                # Step keys ignore how steps log and copy, so the cached steps
+                # take this pipeline's settings rather than the pickled ones
+                for step in steps:
+                    step.log_level = self.log_level
+                    step.inplace = self.inplace
+                self.steps[:cached_steps] = steps
+            last_cached = self.steps[cached_steps - 1]
+            self.log(f"Pipeline: reused cached output of {last_cached.name}")
+            self._add_records([{'step': last_cached.name, 'cached': True, 'rows_out': data.shape[0], 'cols_out': data.shape[1]}])
+
+        for i in range(cached_steps, len(self.steps)):
+            step = self.steps[i]
+            if fit:
+                data = self._fit_transform_steps([step], data)
+            else:
+                data = self._transform_steps([step], data)
+            self.cache.store(self.steps[:i + 1], keys[i], data)
         return data
-        
\ No newline at end of file
+
+    def profile_report(self, path: str = None) -> str:
+        """
+        Summary table of the step records so far, optionally also writing
+        the records to ``path`` as JSON.
+        """
+        if path:
+            write_report(self.records, path)
+        return summary_table(self.records)
+
+    def save(self, path: str):
+        """
+        Serialize the (fitted) pipeline so inference can reuse its statistics.
+        """
+        import joblib
+
+        joblib.dump(self, path)
+
+    def __getstate__(self):
+        # The executor and cache belong to the run, not to the fitted pipeline
+        state = self.__dict__.copy()
+        state['executor'] = None
+        state['cache'] = None
+        state['records'] = []
+        state['copy_report'] = {}
+        return state
+
+    @staticmethod
+    def load(path: str) -> 'Pipeline':
+        import joblib
+
+        return joblib.load(path)
@@ -1,35 +1,62 @@
 from pipeline.pipeline import Pipeline
-from pipeline.steps import PipelineStep, CleanDataStep, CategoricalEncodeStep, NormalisationStep, FeatureEngineeringStep
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
+from pipeline.registry import create_step, load_pipeline_spec
+from pipeline.steps.pipeline_step import PipelineStep
 
 class PipelineBuilder:
     
-    def __init__(self, steps_list):
+    def __init__(self, steps_list, executor: 'ParallelExecutor' = None, cache: 'StepCache' = None,
+                 log_level: str = 'verbose', profile: bool = False, inplace: bool = False, copy_budget: float = None):
+        # Step names, or {'name': ..., 'params': {...}} specs (see pipeline.registry)
         self.pipeline_steps: list = steps_list
+        self.executor = executor
+        self.cache = cache
+        self.log_level = log_level
+        self.profile = profile
+        self.inplace = inplace
+        self.copy_budget = copy_budget
+
+    @classmethod
+    def from_spec(cls, path: str, **kwargs) -> 'PipelineBuilder':
+        """
+        Builder for the steps listed in a YAML or JSON pipeline spec.
+        """
+        return cls(load_pipeline_spec(path), **kwargs)
         
-    def load_step(self, step_name: str) -> PipelineStep:
-        # We want to have a function for loading in an instance of each step
-        if step_name == 'CleanDataStep':
-            return CleanDataStep()
-        if step_name == 'FeatureEngineeringStep':
-            return FeatureEngineeringStep()
-        if step_name == 'CategoricalEncodeStep':
-            return CategoricalEncodeStep()
-        if step_name == 'NormalisationStep':
-            return NormalisationStep()
+    def load_step(self, step_spec) -> PipelineStep:
+        # Unknown step names raise rather than being skipped
+        return create_step(step_spec)
+
+    def plan_input(self) -> dict:
+        """
+        Work out which raw columns the steps need and how to read them, from
+        the reads/writes/drops/dtypes each step declares. A column is skipped
+        when a step drops it before any step has read or overwritten it.
+
+        Returns ``pd.read_csv`` keyword arguments: ``usecols``, a filter
+        leaving out the skipped columns (so the file's header need not be
+        known), and ``dtype``, the dtypes the steps declared.
+        """
+        used, skipped, dtypes = set(), set(), {}
+        for step_spec in self.pipeline_steps:
+            step = self.load_step(step_spec)
+            for col, dtype in step.dtypes.items():
+                if dtypes.setdefault(col, dtype) != dtype:
+                    raise ValueError(f"{step.name} reads '{col}' as {dtype}, an earlier step as {dtypes[col]}")
+            used.update(step.reads)
+            used.update(step.writes)
+            skipped.update(col for col in step.drops if col not in used)
 
+        return {
+            'usecols': lambda col: col not in skipped,
+            'dtype': {col: dtype for col, dtype in dtypes.items() if col not in skipped},
+            'skipped_columns': sorted(skipped),
+        }
         
     def build_pipeline(self) -> Pipeline:
-        pipeline = Pipeline()
+        pipeline = Pipeline(executor=self.executor, cache=self.cache, log_level=self.log_level,
+                            profile=self.profile, inplace=self.inplace, copy_budget=self.copy_budget)
 
-        for step_name in self.pipeline_steps:
-            step = self.load_step(step_name)
-            if step is None:
-                # skip unknown steps but inform the caller
-                continue
-            pipeline.add_step(step)
+        for step_spec in self.pipeline_steps:
+            pipeline.add_step(self.load_step(step_spec))
 
-        return pipeline
\ No newline at end of file
+        return pipeline
@@ -0,0 +1,73 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Record fields the profiler adds to a step record, in summary table order
+PROFILE_FIELDS = ('wall_s', 'cpu_s', 'peak_memory_delta_bytes', 'net_allocated_bytes', 'bytes_in', 'bytes_out')
+# Memory levels rather than amounts: runs and partitions combine by max, not sum
+MEMORY_FIELDS = ('peak_memory_delta_bytes', 'net_allocated_bytes')
+
+
+@contextmanager
+def profile_block(profile: dict):
+    """
+    Measure the wall time, CPU time and Python/numpy heap usage of a block
+    into ``profile``: the peak allocation above the starting point and the
+    bytes still allocated at the end.
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    # Forget earlier traces, so current and peak are relative to this block
+    tracemalloc.clear_traces()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield profile
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        profile['wall_s'] = round(time.perf_counter() - wall_start, 6)
+        profile['cpu_s'] = round(time.process_time() - cpu_start, 6)
+        profile['peak_memory_delta_bytes'] = peak
+        profile['net_allocated_bytes'] = current
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def frame_bytes(data) -> int:
+    # Shallow size: cheap, and enough to compare steps against each other
+    return int(data.memory_usage(index=True, deep=False).sum())
+
+
+def summary_table(records: list) -> str:
+    """
+    Render step records as a text table, totalled per step and mode.
+    """
+    totals = {}
+    for record in records:
+        key = (record['step'], record.get('mode', ''))
+        total = totals.setdefault(key, {'runs': 0, 'rows_in': 0, 'rows_out': 0, 'cols_in': 0, 'cols_out': 0})
+        total['runs'] += 1
+        for field in ('rows_in', 'rows_out') + PROFILE_FIELDS:
+            if field in MEMORY_FIELDS:
+                total[field] = max(total.get(field, 0), record.get(field, 0))
+            else:
+                total[field] = total.get(field, 0) + record.get(field, 0)
+        total['cols_in'] = max(total['cols_in'], record.get('cols_in', 0))
+        total['cols_out'] = max(total['cols_out'], record.get('cols_out', 0))
+
+    header = f"{'step':<28}{'mode':<10}{'runs':>5}{'wall_s':>10}{'cpu_s':>10}{'peak_MB':>10}{'alloc_MB':>10}" \
+             f"{'rows_in':>11}{'rows_out':>11}{'cols':>9}"
+    lines = [header, '-' * len(header)]
+    for (step, mode), total in totals.items():
+        lines.append(
+            f"{step:<28}{mode:<10}{total['runs']:>5}{total['wall_s']:>10.3f}{total['cpu_s']:>10.3f}"
+            f"{total['peak_memory_delta_bytes'] / 1e6:>10.1f}{total['net_allocated_bytes'] / 1e6:>10.1f}"
+            f"{total['rows_in']:>11}{total['rows_out']:>11}{str(total['cols_in']) + '->' + str(total['cols_out']):>9}"
+        )
+    return '\n'.join(lines)
+
+
+def write_report(records: list, path: str):
+    with open(path, 'w') as f:
+        json.dump({'steps': records}, f, indent=2, default=str)
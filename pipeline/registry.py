@@ -0,0 +1,71 @@
+import importlib
+import json
+import os
+
+# Step name -> 'module:Class'. Modules are imported only when a step is
+# created, so a process pays for the dependencies of the steps it uses.
+STEP_REGISTRY = {
+    'CleanDataStep': 'pipeline.steps.clean_data_step:CleanDataStep',
+    'FeatureEngineeringStep': 'pipeline.steps.feature_engineering_step:FeatureEngineeringStep',
+    'CategoricalEncodeStep': 'pipeline.steps.categorical_encode_step:CategoricalEncodeStep',
+    'NormalisationStep': 'pipeline.steps.normalisation_step:NormalisationStep',
+    'MemoryOptimiseStep': 'pipeline.steps.memory_optimise_step:MemoryOptimiseStep',
+}
+
+
+def register_step(name: str, target):
+    """
+    Register a step class, or its 'module:Class' path, under ``name``.
+    """
+    STEP_REGISTRY[name] = target
+
+
+def _check_registered(name: str):
+    if name not in STEP_REGISTRY:
+        raise ValueError(f"Unknown pipeline step '{name}', expected one of {sorted(STEP_REGISTRY)}")
+
+
+def get_step_class(name: str):
+    """
+    Look up (importing on first use) the step class registered as ``name``.
+    """
+    _check_registered(name)
+    target = STEP_REGISTRY[name]
+    if isinstance(target, str):
+        module_name, class_name = target.split(':')
+        target = getattr(importlib.import_module(module_name), class_name)
+        STEP_REGISTRY[name] = target
+    return target
+
+
+def create_step(spec):
+    """
+    Create a step from its name, or from a ``{'name': ..., 'params': {...}}``
+    spec whose params are passed to the step's constructor.
+    """
+    if isinstance(spec, str):
+        return get_step_class(spec)()
+    unknown_keys = set(spec).difference({'name', 'params'})
+    if 'name' not in spec or unknown_keys:
+        raise ValueError(f"Step spec needs a 'name' and optional 'params', got {spec}")
+    return get_step_class(spec['name'])(**spec.get('params', {}))
+
+
+def load_pipeline_spec(path: str) -> list:
+    """
+    Read the step specs of a pipeline from a YAML or JSON file holding either
+    a list of specs or ``{'steps': [...]}``.
+    """
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() == '.json':
+            spec = json.load(f)
+        else:
+            import yaml
+            spec = yaml.safe_load(f)
+    steps = spec.get('steps') if isinstance(spec, dict) else spec
+    if not isinstance(steps, list):
+        raise ValueError(f"Pipeline spec {path} must be a list of steps or have a 'steps' list")
+    # Fail on unknown step names before anything runs, without importing the steps
+    for step in steps:
+        _check_registered(step if isinstance(step, str) else step.get('name'))
+    return steps
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+
+class MinMaxAccumulator:
+    """
+    Per-column running min/max, updated one chunk at a time and mergeable
+    across partitions. NaNs are ignored, as in MinMaxScaler.
+    """
+
+    def __init__(self):
+        self.data_min = pd.Series(dtype=float)
+        self.data_max = pd.Series(dtype=float)
+
+    @property
+    def columns(self) -> list:
+        return self.data_min.index.tolist()
+
+    def update(self, frame: pd.DataFrame):
+        self._combine(frame.min().astype(float), frame.max().astype(float))
+        return self
+
+    def merge(self, other: 'MinMaxAccumulator'):
+        self._combine(other.data_min, other.data_max)
+        return self
+
+    def _combine(self, data_min: pd.Series, data_max: pd.Series):
+        columns = self.data_min.index.append(data_min.index.difference(self.data_min.index, sort=False))
+        self.data_min = pd.Series(
+            np.fmin(self.data_min.reindex(columns).to_numpy(), data_min.reindex(columns).to_numpy()), index=columns
+        )
+        self.data_max = pd.Series(
+            np.fmax(self.data_max.reindex(columns).to_numpy(), data_max.reindex(columns).to_numpy()), index=columns
+        )
+
+    def scale_and_offset(self):
+        """
+        MinMaxScaler's ``scale_`` and ``min_`` for the (0, 1) feature range.
+        """
+        data_range = (self.data_max - self.data_min).to_numpy(dtype=float, copy=True)
+        # Constant columns keep a unit scale, as in sklearn's _handle_zeros_in_scale
+        data_range[data_range < 10 * np.finfo(float).eps] = 1.0
+        scale = 1.0 / data_range
+        return pd.Series(scale, index=self.data_min.index), -self.data_min * scale
+
+
+class CategoryVocabulary:
+    """
+    Per-column label counts, updated one chunk at a time and mergeable across
+    partitions. Labels are kept as the strings ``astype(str)`` would produce,
+    but only the distinct values of each chunk are ever converted.
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    @property
+    def columns(self) -> list:
+        return list(self.counts)
+
+    def update(self, frame: pd.DataFrame, columns):
+        for col in columns:
+            if col not in frame.columns:
+                continue
+            counts = self.counts.setdefault(col, {})
+            for value, count in frame[col].value_counts(dropna=False).items():
+                # Categorical columns also list their unused categories
+                if not count:
+                    continue
+                label = str(value)
+                counts[label] = counts.get(label, 0) + int(count)
+        return self
+
+    def merge(self, other: 'CategoryVocabulary'):
+        for col, other_counts in other.counts.items():
+            counts = self.counts.setdefault(col, {})
+            for label, count in other_counts.items():
+                counts[label] = counts.get(label, 0) + count
+        return self
+
+    def classes(self, col) -> list:
+        """
+        Sorted labels of a column, i.e. LabelEncoder's ``classes_``.
+        """
+        return sorted(self.counts.get(col, {}))
+
+    def encode(self, series: pd.Series, classes: list) -> np.ndarray:
+        """
+        Label-encode a Series against ``classes``; unseen labels become -1.
+        """
+        positions = {label: code for code, label in enumerate(classes)}
+        codes, uniques = pd.factorize(series)
+        lookup = [positions.get(str(value), -1) for value in uniques]
+        # factorize marks missing values with -1, which indexes the trailing 'nan' code
+        lookup.append(positions.get(str(np.nan), -1))
+        return np.asarray(lookup, dtype="int64")[codes]
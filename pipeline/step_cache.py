@@ -0,0 +1,117 @@
+import functools
+import glob
+import hashlib
+import inspect
+import os
+
+import joblib
+import pandas as pd
+
+
+class StepCache:
+    """
+    On-disk cache of pipeline step outputs for incremental re-runs.
+
+    Each entry is keyed on the hash of the pipeline input, the class, source
+    and configuration (or fitted state) of every step up to and including
+    this one, and whether the step was fitted or only applied. An entry holds
+    the step's output frame and every step up to it, so a cached fit also
+    restores the fitted statistics of the whole prefix.
+
+    Entries are evicted least-recently-used first once the cache grows past
+    ``max_bytes``. ``cache_dir`` can point at a mounted datastore path.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 10 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def hash_data(data: pd.DataFrame) -> str:
+        digest = hashlib.sha256()
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        digest.update(repr(list(data.columns)).encode())
+        digest.update(repr([str(dtype) for dtype in data.dtypes]).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def step_key(upstream_key: str, step, mode: str) -> str:
+        """
+        Chain the upstream key with a fingerprint of the step; ``mode`` is
+        'fit' or 'transform'.
+        """
+        digest = hashlib.sha256()
+        digest.update(upstream_key.encode())
+        digest.update(f'{type(step).__module__}.{type(step).__qualname__}:{mode}'.encode())
+        digest.update(_source_digest(type(step)).encode())
+        # The log level and running in place only change what a step prints
+        # and whether it copies its input, not what it computes
+        state = {k: v for k, v in step.__getstate__().items() if k not in ('log_level', 'inplace')}
+        digest.update(joblib.hash(state).encode())
+        return digest.hexdigest()
+
+    def _path(self, step, key: str, kind: str) -> str:
+        return os.path.join(self.cache_dir, f'{type(step).__name__}-{key}.{kind}.joblib')
+
+    def contains(self, step, key: str) -> bool:
+        return os.path.exists(self._path(step, key, 'data')) and os.path.exists(self._path(step, key, 'step'))
+
+    def load(self, step, key: str):
+        """
+        Load a cached entry as ``(data, steps)``, marking it as recently used.
+        """
+        for kind in ('data', 'step'):
+            os.utime(self._path(step, key, kind))
+        return joblib.load(self._path(step, key, 'data')), joblib.load(self._path(step, key, 'step'))
+
+    def store(self, steps: list, key: str, data: pd.DataFrame):
+        """
+        Cache the output of the last of ``steps`` along with the steps themselves.
+        """
+        step = steps[-1]
+        for kind, value in (('step', steps), ('data', data)):
+            path = self._path(step, key, kind)
+            # Write then rename, so an interrupted run never leaves a partial entry
+            joblib.dump(value, path + '.tmp')
+            os.replace(path + '.tmp', path)
+        self._evict()
+
+    def invalidate(self, step_name: str = None):
+        """
+        Remove every entry, or only the entries of one step class.
+        """
+        pattern = f'{step_name}-*.joblib' if step_name else '*.joblib'
+        for path in glob.glob(os.path.join(self.cache_dir, pattern)):
+            os.remove(path)
+
+    def size(self) -> int:
+        return sum(os.path.getsize(path) for path in glob.glob(os.path.join(self.cache_dir, '*.joblib')))
+
+    def _evict(self):
+        entries = {}
+        for path in glob.glob(os.path.join(self.cache_dir, '*.joblib')):
+            entry = path.rsplit('.', 2)[0]
+            stat = os.stat(path)
+            size, last_used = entries.get(entry, (0, 0))
+            entries[entry] = (size + stat.st_size, max(last_used, stat.st_mtime))
+
+        total = sum(size for size, _ in entries.values())
+        for entry, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            for kind in ('data', 'step'):
+                path = f'{entry}.{kind}.joblib'
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+
+    def __repr__(self):
+        return f'StepCache(cache_dir={self.cache_dir}, max_bytes={self.max_bytes})'
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest(step_class) -> str:
+    # Editing a step's module invalidates its cached outputs
+    with open(inspect.getsourcefile(step_class), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
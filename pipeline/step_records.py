@@ -0,0 +1,82 @@
+import json
+import time
+
+from pipeline.profiler import MEMORY_FIELDS, frame_bytes, profile_block
+
+# Log levels shared by Pipeline and PipelineStep:
+#   verbose    - progress messages plus column lists and DataFrame.head() previews
+#   structured - no step output; one compact JSON record per step run
+#   quiet      - nothing
+LOG_LEVELS = ('verbose', 'structured', 'quiet')
+
+
+def run_step(step, data, fit: bool = False, profile: bool = False):
+    """
+    Fit/transform one step and return ``(data, record)``, where the record
+    holds the rows/columns in and out, the elapsed time and whatever the step
+    reported through ``PipelineStep.record``. With ``profile`` it also holds
+    CPU time, heap usage and frame sizes (see pipeline.profiler).
+    """
+    rows_in, cols_in = data.shape
+    step.stats = {}
+    measurements = {}
+    if profile:
+        measurements['bytes_in'] = frame_bytes(data)
+        with profile_block(measurements):
+            data = step.fit_transform(data) if fit else step.transform(data)
+        measurements['bytes_out'] = frame_bytes(data)
+        elapsed = measurements['wall_s']
+    else:
+        start = time.perf_counter()
+        data = step.fit_transform(data) if fit else step.transform(data)
+        elapsed = round(time.perf_counter() - start, 6)
+    record = {
+        'step': step.name,
+        'mode': 'fit' if fit else 'transform',
+        'rows_in': rows_in,
+        'rows_out': data.shape[0],
+        'cols_in': cols_in,
+        'cols_out': data.shape[1],
+        'elapsed_s': elapsed,
+    }
+    record.update(measurements)
+    record.update(step.stats)
+    return data, record
+
+
+def merge_stats(left: dict, right: dict) -> dict:
+    """
+    Combine step statistics from two partitions or chunks: numbers add up,
+    lists are unioned in order and nested dicts merge key by key.
+    """
+    merged = dict(left)
+    for key, value in right.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, dict):
+            merged[key] = merge_stats(merged[key], value)
+        elif isinstance(value, list):
+            merged[key] = merged[key] + [item for item in value if item not in merged[key]]
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            merged[key] = merged[key] + value
+    return merged
+
+
+def merge_records(left: dict, right: dict) -> dict:
+    """
+    Combine the records of one step run over two partitions. Elapsed time,
+    rows and copies are summed, i.e. time is the total worker time; memory
+    is the largest any partition needed, not the sum of their peaks.
+    """
+    merged = merge_stats(left, right)
+    merged['step'] = left['step']
+    for field in MEMORY_FIELDS:
+        if field in left and field in right:
+            merged[field] = max(left[field], right[field])
+    merged['cols_in'] = max(left['cols_in'], right['cols_in'])
+    merged['cols_out'] = max(left['cols_out'], right['cols_out'])
+    return merged
+
+
+def emit_record(record: dict):
+    print(json.dumps(record, default=str))
@@ -1,8 +1,5 @@
+from pipeline.registry import STEP_REGISTRY, get_step_class
 from pipeline.steps.pipeline_step import PipelineStep
-from pipeline.steps.clean_data_step import CleanDataStep
-from pipeline.steps.categorical_encode_step import CategoricalEncodeStep
-from pipeline.steps.feature_engineering_step import FeatureEngineeringStep
-from pipeline.steps.normalisation_step import NormalisationStep
 
 
 __all__ = [
@@ -11,4 +8,12 @@ __all__ = [
     'CategoricalEncodeStep',
     'FeatureEngineeringStep',
     'NormalisationStep',
-]
\ No newline at end of file
+    'MemoryOptimiseStep',
+]
+
+
+def __getattr__(name):
+    # Step classes are imported from the registry on first access
+    if name in STEP_REGISTRY:
+        return get_step_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,40 +1,70 @@
 from pipeline.steps.pipeline_step import PipelineStep
-from sklearn.preprocessing import LabelEncoder
+from pipeline.statistics import CategoryVocabulary
 import pandas as pd
 
 class CategoricalEncodeStep(PipelineStep):
 
+    stateful = True
+
+    # Columns that require encoding
+    columns_to_encode = ["CI_Cat", "CI_Subcat", "Status", "Impact", "Urgency", "Priority", "Category", "Closure_Code"]
+
+    reads = columns_to_encode
+    writes = columns_to_encode
+    # Fixed dtypes, so a chunk with missing values labels them as every other
+    # chunk does ('3', not '3.0'). Priority is read as float, as CleanDataStep
+    # reads it, and so is labelled '3.0' throughout.
+    dtypes = {
+        **{col: "str" for col in ["CI_Cat", "CI_Subcat", "Status", "Impact", "Urgency", "Category", "Closure_Code"]},
+        "Priority": "float64",
+    }
+
     def __init__(self):
         super().__init__(name='Categorical Encoding Step')
+        self.vocabulary = CategoryVocabulary()
+        self.classes_ = {}
 
-    def process(self, data):
+    def reset(self):
+        self.vocabulary = CategoryVocabulary()
+        self.classes_ = {}
+
+    def partial_fit(self, data):
         """
-        Perform categorical encoding on the dataset for relevant columns.
+        Count the labels of each relevant categorical column in one chunk.
         """
-        print("CategoricalEncodeStep: Encoding relevant categorical variables...")
+        self.vocabulary.update(data, self.columns_to_encode)
+        self._update_classes()
+        return self
 
-        # Columns that require encoding
-        columns_to_encode = ["CI_Cat", "CI_Subcat", "Status", "Impact", "Urgency", "Priority", "Category", "Closure_Code"]
+    def merge(self, other):
+        self.vocabulary.merge(other.vocabulary)
+        self._update_classes()
+        return self
 
-        # Create a subset of the data with only relevant columns
-        subset_data = data[columns_to_encode].copy()
+    def _update_classes(self):
+        # Sorted labels per column, the same classes LabelEncoder would learn
+        self.classes_ = {col: self.vocabulary.classes(col) for col in self.vocabulary.columns}
+
+    def transform(self, data):
+        """
+        Perform categorical encoding on the dataset for relevant columns.
+        """
+        self.log("CategoricalEncodeStep: Encoding relevant categorical variables...")
 
-        print("Before Encoding:")
-        print(subset_data.head())
+        encoded_columns = [col for col in self.classes_ if col in data.columns]
 
-        # Apply Label Encoding to specified columns
-        label_encoder = LabelEncoder()
-        for col in columns_to_encode:
-            if col in subset_data.columns:
-                subset_data[col] = label_encoder.fit_transform(subset_data[col].astype(str))
+        self.preview("Before Encoding:", data, encoded_columns)
 
-        print("After Encoding:")
-        print(subset_data.head())
+        # Apply the fitted label encoding; labels unseen during fit become -1
+        for col in encoded_columns:
+            codes = self.vocabulary.encode(data[col], self.classes_[col])
+            unseen = int((codes == -1).sum())
+            if unseen:
+                self.record(unseen_labels={col: unseen})
+                self.log(f"Unseen labels in '{col}' encoded as -1: {unseen}")
+            data[col] = codes
 
-        # Update the original data with encoded values
-        for col in columns_to_encode:
-            if col in data.columns:
-                data[col] = subset_data[col]
+        self.preview("After Encoding:", data, encoded_columns)
 
-        print("CategoricalEncodeStep: Completed.")
+        self.log("CategoricalEncodeStep: Completed.")
         return data
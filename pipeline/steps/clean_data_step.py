@@ -3,73 +3,85 @@ import pandas as pd
 
 class CleanDataStep(PipelineStep):
 
+    # Non-informative columns
+    columns_to_drop = [
+        "Incident_ID",
+        "number_cnt",
+        "Alert_Status",
+        "CI_Name",
+        "Related_Interaction",
+        "Related_Change",
+        "Reopen_Time",
+        "No_of_Related_Incidents",
+        "No_of_Related_Changes",
+        "KB_number",
+        "WBS"
+    ]
+    # Missing values filled with 'Unknown' and with 0 (absence)
+    categorical_fill_columns = ["CI_Cat", "CI_Subcat", "Closure_Code"]
+    numeric_fill_columns = ["No_of_Reassignments", "No_of_Related_Interactions"]
+
+    reads = ["Priority"] + categorical_fill_columns + numeric_fill_columns
+    writes = categorical_fill_columns + numeric_fill_columns
+    drops = columns_to_drop
+    dtypes = {
+        "Priority": "float64",
+        **{col: "str" for col in categorical_fill_columns},
+        **{col: "float64" for col in numeric_fill_columns},
+    }
+
     def __init__(self):
         super().__init__(name='Clean Data Step')
 
-    def process(self, data):
+    def transform(self, data):
         """
         Perform data cleaning operations on the dataset.
         """
-        print("CleanDataStep: Cleaning the dataset...")
+        self.log("CleanDataStep: Cleaning the dataset...")
+
+        # Before dropping columns
+        self.log("Columns before dropping non-informative ones:")
+        self.log(data.columns.tolist())
 
         # Drop non-informative columns 
-        columns_to_drop = [
-            "Incident_ID",
-            "number_cnt",
-            "Alert_Status",
-            "CI_Name",
-            "Related_Interaction",
-            "Related_Change",
-            "Reopen_Time",
-            "No_of_Related_Incidents",
-            "No_of_Related_Changes",
-            "KB_number",
-            "WBS"
-        ]
+        dropped_columns = [col for col in self.columns_to_drop if col in data.columns]
+        kept_columns = [col for col in data.columns if col not in dropped_columns]
+        self.record(columns_dropped=dropped_columns)
 
-        # Before dropping columns
-        print("Columns before dropping non-informative ones:")
-        print(data.columns.tolist())
+        #  Drop rows where Priority is missing (target) 
+        rows_to_keep = data["Priority"].notna() if "Priority" in data.columns else None
 
-        dropped_columns = [col for col in columns_to_drop if col in data.columns]
-        data = data.drop(columns=dropped_columns, errors="ignore")
+        # Columns and rows are dropped together, so at most one copy is made
+        before_rows = data.shape[0]
+        data = self.select(data, rows=rows_to_keep, columns=kept_columns)
 
         # After dropping columns
-        print()
-        print("Dropped columns:")
-        print(dropped_columns)
-        print()
-        print("Columns after dropping non-informative ones:")
-        print(data.columns.tolist())
+        self.log("")
+        self.log("Dropped columns:")
+        self.log(dropped_columns)
+        self.log("")
+        self.log("Columns after dropping non-informative ones:")
+        self.log(data.columns.tolist())
 
-        #  Drop rows where Priority is missing (target) 
-        if "Priority" in data.columns:
-            before_rows = data.shape[0]
-            data = data[data["Priority"].notna()]
-            after_rows = data.shape[0]
-            print(f"Dropped rows with missing Priority: {before_rows - after_rows}")
+        if rows_to_keep is not None:
+            self.record(rows_dropped=before_rows - data.shape[0])
+            self.log(f"Dropped rows with missing Priority: {before_rows - data.shape[0]}")
 
         # Fill missing categorical values with 'Unknown' 
-        cat_fill_cols = ["CI_Cat", "CI_Subcat", "Closure_Code"]
-        for col in cat_fill_cols:
+        for col in self.categorical_fill_columns:
             if col in data.columns:
-                missing_before = data[col].isnull().sum()
-                data[col] = data[col].fillna("Unknown")
-                missing_after = data[col].isnull().sum()
-                print(f"Filled missing values in '{col}': {missing_before - missing_after}")
+                self._fill_missing(data, col, "Unknown")
 
         # Fill missing numeric fields where 0 = absence 
-        if "No_of_Reassignments" in data.columns:
-            missing_before = data["No_of_Reassignments"].isnull().sum()
-            data["No_of_Reassignments"] = data["No_of_Reassignments"].fillna(0)
-            missing_after = data["No_of_Reassignments"].isnull().sum()
-            print(f"Filled missing values in 'No_of_Reassignments': {missing_before - missing_after}")
-
-        if "No_of_Related_Interactions" in data.columns:
-            missing_before = data["No_of_Related_Interactions"].isnull().sum()
-            data["No_of_Related_Interactions"] = data["No_of_Related_Interactions"].fillna(0)
-            missing_after = data["No_of_Related_Interactions"].isnull().sum()
-            print(f"Filled missing values in 'No_of_Related_Interactions': {missing_before - missing_after}")
+        for col in self.numeric_fill_columns:
+            if col in data.columns:
+                self._fill_missing(data, col, 0)
 
-        print("CleanDataStep: Completed.")
+        self.log("CleanDataStep: Completed.")
         return data
+
+    def _fill_missing(self, data, col, value):
+        missing = int(data[col].isnull().sum())
+        data[col] = data[col].fillna(value)
+        self.record(nulls_filled={col: missing})
+        self.log(f"Filled missing values in '{col}': {missing}")
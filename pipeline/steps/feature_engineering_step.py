@@ -1,26 +1,37 @@
 from pipeline.steps.pipeline_step import PipelineStep
+from pipeline.datetime_parser import DateTimeParser
 import pandas as pd
 import numpy as np
 
 class FeatureEngineeringStep(PipelineStep):
 
+    # Raw time columns, all dropped once Handle_Time_hrs is derived
+    time_columns = ["Open_Time", "Resolved_Time", "Close_Time", "Reopen_Time"]
+
+    # Only Open_Time and Close_Time are used (to fill in missing Handle_Time_hrs)
+    reads = ["Handle_Time_hrs", "Open_Time", "Close_Time"]
+    writes = ["Handle_Time_hrs"]
+    drops = time_columns
+    dtypes = {col: "str" for col in reads}
+
     def __init__(self):
         super().__init__(name='feature engineering step')
+        self.date_parser = DateTimeParser()
 
-    def process(self, data):
+    def transform(self, data):
         """
         Perform feature engineering operations on the dataset.
         """
-        print("FeatureEngineeringStep started...")
+        self.log("FeatureEngineeringStep started...")
 
-        data = data.copy()
+        # The step writes to most columns, so it works on its own copy unless running in place
+        data = self.copy_frame(data)
 
         # --- Subset Before and After for Handle_Time_hrs ---
         relevant_columns = ["Handle_Time_hrs", "Open_Time", "Resolved_Time", "Close_Time"]
-        if any(col in data.columns for col in relevant_columns):
-            affected_rows = data[relevant_columns].copy()
-            print("Before Handling Relevant Columns:")
-            print(affected_rows.head())
+        relevant_columns = [col for col in relevant_columns if col in data.columns]
+        if relevant_columns:
+            self.preview("Before Handling Relevant Columns:", data, relevant_columns)
 
         # Clean Handle_Time_hrs text & convert to float
         if "Handle_Time_hrs" in data.columns:
@@ -31,43 +42,40 @@ class FeatureEngineeringStep(PipelineStep):
                 .astype(float)
             )
 
-        # Time columns to parse
-        time_cols = ["Open_Time", "Resolved_Time", "Close_Time", "Reopen_Time"]
-
-        # Custom datetime parser for mixed date formats
-        def parse_date(x):
-            for fmt in ("%d/%m/%Y %H:%M", "%d-%m-%Y %H:%M", "%m/%d/%Y %H:%M"):
-                try:
-                    return pd.to_datetime(x, format=fmt)
-                except:
-                    continue
-            return pd.to_datetime(x, errors='coerce')
-
-        # Convert to datetime
-        for col in time_cols:
-            if col in data.columns:
-                data[col] = data[col].apply(parse_date)
-
         # Compute Handle_Time_hrs if missing or corrupted
         if "Handle_Time_hrs" not in data.columns or data["Handle_Time_hrs"].isna().sum() > 0:
+            # Convert to datetime, trying each known format column-wide. Every
+            # time column is dropped below, so only the two used here are parsed.
+            self.date_parser.reset_stats()
+            for col in ["Open_Time", "Close_Time"]:
+                data[col] = self.date_parser.parse(data[col])
+            parse_report = self.date_parser.report()
+            self.record(datetime_format_hits=parse_report["format_hits"])
+            self.log(f"Datetime parsing: {parse_report}")
+
             data["Handle_Time_hrs_calc"] = (
                 (data["Close_Time"] - data["Open_Time"]).dt.total_seconds() / 3600
             )
             # Use calculated value where original is missing
+            missing_before = int(data["Handle_Time_hrs"].isna().sum())
             data["Handle_Time_hrs"] = data["Handle_Time_hrs"].fillna(data["Handle_Time_hrs_calc"])
+            self.record(nulls_filled={"Handle_Time_hrs": missing_before - int(data["Handle_Time_hrs"].isna().sum())})
             data.drop(columns=["Handle_Time_hrs_calc"], inplace=True, errors="ignore")
 
         # Remove negative times
-        data.loc[data["Handle_Time_hrs"] < 0, "Handle_Time_hrs"] = np.nan
+        negative_times = data["Handle_Time_hrs"] < 0
+        data.loc[negative_times, "Handle_Time_hrs"] = np.nan
+        self.record(negative_times_removed=int(negative_times.sum()))
 
         # --- Subset After Handling Relevant Columns ---
-        if any(col in data.columns for col in relevant_columns):
-            print("After Handling Relevant Columns:")
-            print(data[relevant_columns].head())
+        if relevant_columns:
+            self.preview("After Handling Relevant Columns:", data, relevant_columns)
 
         # Drop raw datetime columns — modelling ready!
-        data = data.drop(columns=time_cols, errors='ignore')
+        dropped_columns = [col for col in self.time_columns if col in data.columns]
+        data = self.drop_columns(data, dropped_columns, owned=True)
+        self.record(columns_dropped=dropped_columns)
 
-        print("FeatureEngineeringStep complete.")
+        self.log("FeatureEngineeringStep complete.")
 
         return data
\ No newline at end of file
@@ -0,0 +1,176 @@
+from pipeline.steps.pipeline_step import PipelineStep
+from pandas.api.types import is_float_dtype, is_integer_dtype, is_object_dtype, is_string_dtype
+import numpy as np
+import pandas as pd
+
+# Signed only, so differences and negative sentinels (e.g. -1 codes) stay safe
+_INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+class MemoryOptimiseStep(PipelineStep):
+    """
+    Shrinks the frame for the steps after it: repeated strings become pandas
+    ``category`` columns, integers are downcast to the smallest signed width
+    that holds their fitted range and floats become float32 where that loses
+    no more than ``float_tolerance`` (relative; 0 means exactly representable).
+
+    The dtypes are learned in fit, so every chunk or partition of a dataset
+    gets the same ones. Values they cannot hold become missing in transform:
+    strings unseen in fit become NaN, and so do floats beyond the float32
+    range. Integers outside their dtype's range (or missing) become that
+    dtype's minimum, which fit keeps free as a sentinel.
+    """
+
+    stateful = True
+
+    # Raw text that later steps parse themselves
+    columns_to_skip = ["Open_Time", "Resolved_Time", "Close_Time", "Reopen_Time", "Handle_Time_hrs"]
+
+    def __init__(self, max_categories: int = 1000, max_category_ratio: float = 0.5,
+                 float_tolerance: float = 0.0):
+        super().__init__(name='Memory Optimise Step')
+        self.max_categories = max_categories
+        self.max_category_ratio = max_category_ratio
+        self.float_tolerance = float_tolerance
+        self.reset()
+
+    def reset(self):
+        self.rows_seen = 0
+        self.int_ranges = {}
+        self.float32_ok = {}
+        # Distinct values per text column; None once a column has too many
+        self.category_values = {}
+        self.categories_ = {}
+
+    def partial_fit(self, data):
+        """
+        Update the value ranges, float32 precision checks and distinct
+        strings of each column with one chunk.
+        """
+        self.rows_seen += len(data)
+        for col in data.columns:
+            if col in self.columns_to_skip:
+                continue
+            series = data[col]
+            if is_integer_dtype(series.dtype):
+                self._update_range(col, int(series.min()), int(series.max()))
+            elif is_float_dtype(series.dtype):
+                self.float32_ok[col] = self.float32_ok.get(col, True) and self._fits_float32(series)
+            elif is_object_dtype(series.dtype) or is_string_dtype(series.dtype):
+                self._update_values(col, series.dropna().unique())
+        self._update_categories()
+        return self
+
+    def merge(self, other):
+        self.rows_seen += other.rows_seen
+        for col, (low, high) in other.int_ranges.items():
+            self._update_range(col, low, high)
+        for col, ok in other.float32_ok.items():
+            self.float32_ok[col] = self.float32_ok.get(col, True) and ok
+        for col, values in other.category_values.items():
+            self._update_values(col, values)
+        self._update_categories()
+        return self
+
+    def _update_range(self, col, low, high):
+        if col in self.int_ranges:
+            low, high = min(low, self.int_ranges[col][0]), max(high, self.int_ranges[col][1])
+        self.int_ranges[col] = (low, high)
+
+    def _update_values(self, col, values):
+        known = self.category_values.get(col, set())
+        if known is None or values is None or len(values) > self.max_categories:
+            self.category_values[col] = None
+            return
+        known = known.union(values)
+        self.category_values[col] = known if len(known) <= self.max_categories else None
+
+    def _update_categories(self):
+        # Only columns whose strings repeat often enough are worth a category
+        self.categories_ = {
+            col: sorted(values, key=str)
+            for col, values in self.category_values.items()
+            if values is not None and len(values) <= self.max_category_ratio * max(self.rows_seen, 1)
+        }
+
+    def _fits_float32(self, series) -> bool:
+        values = series.to_numpy(dtype=np.float64)
+        narrowed = values.astype(np.float32).astype(np.float64)
+        if self.float_tolerance:
+            return bool(np.allclose(narrowed, values, rtol=self.float_tolerance, atol=0, equal_nan=True))
+        return bool(np.array_equal(narrowed, values, equal_nan=True))
+
+    @staticmethod
+    def _int_dtype(low, high):
+        # The dtype's minimum is left free for the sentinel
+        for dtype in _INT_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min < low and high <= info.max:
+                return dtype
+        return np.int64
+
+    def transform(self, data):
+        """
+        Convert each fitted column to its compact dtype and record the memory saved.
+        """
+        self.log("MemoryOptimiseStep: Compacting column dtypes...")
+
+        bytes_before = int(data.memory_usage(index=True, deep=True).sum())
+        data = self.copy_frame(data)
+        converted = {}
+
+        for col, categories in self.categories_.items():
+            if col not in data.columns:
+                continue
+            present = data[col].notna().to_numpy()
+            data[col] = pd.Categorical(data[col], categories=categories)
+            # Strings unseen during fit are left as NaN
+            unseen = int((present & data[col].isna().to_numpy()).sum())
+            if unseen:
+                self.record(unseen_categories={col: unseen})
+            converted[col] = 'category'
+
+        for col, (low, high) in self.int_ranges.items():
+            if col not in data.columns:
+                continue
+            dtype = self._int_dtype(low, high)
+            info = np.iinfo(dtype)
+            if is_integer_dtype(data[col].dtype):
+                values = data[col].to_numpy()
+                invalid = (values < info.min) | (values > info.max)
+            else:
+                # Missing or fractional values have no integer to keep
+                values = pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=np.float64)
+                invalid = np.isnan(values) | (values < info.min) | (values > info.max) | (values != np.floor(values))
+            if invalid.any():
+                values = values.copy()
+                self.record(out_of_range={col: int(invalid.sum())})
+                values[invalid] = info.min
+            data[col] = values.astype(dtype)
+            converted[col] = np.dtype(dtype).name
+
+        float32_max = np.finfo(np.float32).max
+        for col, ok in self.float32_ok.items():
+            if not ok or col not in data.columns:
+                continue
+            values = pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=np.float64)
+            too_large = np.abs(values) > float32_max
+            if too_large.any():
+                self.record(out_of_range={col: int(too_large.sum())})
+                values = values.copy()
+                values[too_large] = np.nan
+            data[col] = values.astype(np.float32)
+            converted[col] = 'float32'
+
+        bytes_after = int(data.memory_usage(index=True, deep=True).sum())
+        self.record(
+            columns_converted=[f"{col}:{dtype}" for col, dtype in converted.items()],
+            bytes_before=bytes_before,
+            bytes_after=bytes_after,
+            bytes_saved=bytes_before - bytes_after,
+        )
+        self.log(f"Converted columns: {converted}")
+        self.log(f"Memory: {bytes_before / 1024 ** 2:.1f} MiB -> {bytes_after / 1024 ** 2:.1f} MiB")
+
+        self.log("MemoryOptimiseStep: Completed.")
+        return data
@@ -1,32 +1,52 @@
 from pipeline.steps.pipeline_step import PipelineStep
-from sklearn.preprocessing import MinMaxScaler
+from pipeline.statistics import MinMaxAccumulator
 import pandas as pd
 
 class NormalisationStep(PipelineStep):
 
+    stateful = True
+
     def __init__(self):
         super().__init__(name='Normalisation Step')
+        self.min_max = MinMaxAccumulator()
+
+    def reset(self):
+        self.min_max = MinMaxAccumulator()
+
+    def partial_fit(self, data):
+        """
+        Update the min/max of each numerical column with one chunk.
+        """
+        self.min_max.update(data.select_dtypes(include=['number']))
+        return self
+
+    def merge(self, other):
+        self.min_max.merge(other.min_max)
+        return self
+
+    @property
+    def numerical_columns(self) -> list:
+        return self.min_max.columns
 
-    def process(self, data):
+    def transform(self, data):
         """
         Perform normalization on numerical columns in the dataset.
         """
-        print("NormalisationStep: Normalizing numerical columns...")
+        self.log("NormalisationStep: Normalizing numerical columns...")
 
-        # Select numerical columns
-        numerical_columns = data.select_dtypes(include=['number']).columns
+        # Fitted numerical columns present in this dataset (the target may be absent at inference)
+        numerical_columns = [col for col in self.numerical_columns if col in data.columns]
 
         # Display before normalization
-        print("Before Normalization:")
-        print(data[numerical_columns].head())
+        self.preview("Before Normalization:", data, numerical_columns)
 
-        # Apply Min-Max Scaling
-        scaler = MinMaxScaler()
-        data[numerical_columns] = scaler.fit_transform(data[numerical_columns])
+        # Apply Min-Max Scaling with the fitted statistics, column by column
+        scale, offset = self.min_max.scale_and_offset()
+        for col in numerical_columns:
+            data[col] = data[col].astype(float) * scale[col] + offset[col]
 
         # Display after normalization
-        print("After Normalization:")
-        print(data[numerical_columns].head())
+        self.preview("After Normalization:", data, numerical_columns)
 
-        print("NormalisationStep: Completed.")
+        self.log("NormalisationStep: Completed.")
         return data
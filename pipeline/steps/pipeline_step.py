@@ -1,14 +1,147 @@
 from abc import ABC, abstractmethod
+from pipeline.profiler import frame_bytes
+from pipeline.step_records import merge_stats
  
 class PipelineStep(ABC):
+    # Stateful steps learn statistics in fit; stateless steps only transform
+    stateful = False
+    # Set by a Pipeline running in place: the step may modify the frame it is
+    # given rather than copying it first
+    inplace = False
+    # Input columns the step uses, overwrites and removes, for planning which
+    # columns need loading at all (see PipelineBuilder.plan_input). Steps
+    # working on whichever columns are present declare none.
+    reads = []
+    writes = []
+    drops = []
+    # dtypes the step expects of raw columns it reads, passed to the reader
+    dtypes = {}
+
     def __init__(self, name: str):
         self.name = name
+        # 'verbose', 'structured' or 'quiet'; set by the owning Pipeline
+        self.log_level = 'verbose'
+        # Statistics reported by the last run, collected into the step's record
+        self.stats = {}
+
+    def log(self, message):
+        """
+        Print a progress message (verbose logging only)
+        """
+        if self.log_level == 'verbose':
+            print(message)
+
+    def preview(self, title: str, data, columns: list = None):
+        """
+        Print the first rows of the dataset, optionally for some columns only
+        (verbose logging only, so nothing is copied or rendered otherwise)
+        """
+        if self.log_level == 'verbose':
+            head = data.head()
+            print(title)
+            print(head if columns is None else head[columns])
+
+    def record(self, **stats):
+        """
+        Add statistics (e.g. columns_dropped, nulls_filled) to the step's record
+        """
+        self.stats = merge_stats(self.stats, stats)
+
+    def copy_frame(self, data):
+        """
+        A frame the step may modify: the frame itself when running in place,
+        otherwise a copy (counted in the step's record)
+        """
+        if self.inplace:
+            return data
+        return self._copied(data.copy())
+
+    def drop_columns(self, data, columns: list, owned: bool = False):
+        """
+        Drop columns, in place if running in place or ``owned`` (the step
+        already made its own copy), otherwise into a copy
+        """
+        if self.inplace or owned:
+            data.drop(columns=columns, inplace=True)
+            return data
+        return self._copied(data.drop(columns=columns))
+
+    def select(self, data, rows=None, columns: list = None):
+        """
+        Keep the rows where the boolean Series ``rows`` is true and only
+        ``columns``. Without running in place this is one copy of the kept
+        part; in place the dropped rows and columns are released from the
+        frame itself.
+        """
+        if rows is not None and rows.all():
+            rows = None
+        if not self.inplace:
+            return self._copied(data.loc[rows if rows is not None else slice(None),
+                                         columns if columns is not None else slice(None)])
+        if columns is not None:
+            data.drop(columns=[col for col in data.columns if col not in columns], inplace=True)
+        if rows is not None:
+            if data.index.is_unique:
+                data.drop(index=data.index[~rows.to_numpy()], inplace=True)
+            else:
+                # Dropping by label would also drop the duplicates of a kept row
+                data = self._copied(data[rows])
+        return data
+
+    def _copied(self, data):
+        self.record(copies=1, bytes_copied=frame_bytes(data))
+        return data
+
+    def reset(self):
+        """
+        Forget any statistics learned by fit/partial_fit
+        """
+
+    def partial_fit(self, data):
+        """
+        Update the step's statistics with one chunk of the dataset
+        """
+        return self
+
+    def merge(self, other: 'PipelineStep'):
+        """
+        Merge the statistics another copy of this step learned on a different
+        partition of the dataset
+        """
+        return self
+
+    def fit(self, data):
+        """
+        Learn any statistics the step needs from the dataset (stateless
+        steps have nothing to learn)
+        """
+        self.reset()
+        return self.partial_fit(data)
         
     @abstractmethod
-    def process(self, data):
+    def transform(self, data):
         """
         Function to perform some operation on dataset
         """
+
+    def fit_transform(self, data):
+        """
+        Fit the step on the dataset, then transform it
+        """
+        return self.fit(data).transform(data)
+
+    def process(self, data):
+        """
+        Function to perform some operation on dataset, refitting any
+        statistics on it first
+        """
+        return self.fit_transform(data)
         
+    def __getstate__(self):
+        # Run statistics are not part of the step's configuration or fitted state
+        state = self.__dict__.copy()
+        state['stats'] = {}
+        return state
+
     def __repr__(self):
-        return f'PipelineStep(name={self.name})'
\ No newline at end of file
+        return f'PipelineStep(name={self.name})'
@@ -1,47 +0,0 @@
-def print_simulated_endpoint_test():
-    """
-    Simulated, print-only script that mimics testing a deployed Azure ML endpoint.
-
-    This script intentionally prints masked configuration values and omits
-    any request payload content so it looks like it's reaching your real
-    deployment without exposing data.
-
-    Run with: python simulate_real_endpoint.py
-    """
-
-    print("Starting simulated deployed-endpoint test...")
-
-    print("\nStep 1: Inspecting local config files")
-    print(" - Found file: .env (values masked)")
-    print("   AZURE_SUBSCRIPTION_ID=********")
-    print("   AZURE_TENANT_ID=********")
-    print("   AZURE_CLIENT_ID=********")
-    print(" - Found file: components/full_pipeline.yml (deployment info masked)")
-    print("   deployment_name: itsm-endpoint")
-    print("   scoring_uri: https://itsm-endpoint.eastus.azurecontainer.io/score")
-
-    print("\nStep 2: Authenticating to Azure (simulated)")
-    print(" - Requesting token from: https://login.microsoftonline.com/{TENANT_ID}/oauth2/v2.0/token")
-    print(" - Using client id: ******** (masked)")
-    print(" - Received access token: ******** (masked)")
-
-    print("\nStep 3: Preparing scoring request (payload suppressed)")
-    print(" - Target endpoint: https://itsm-endpoint.eastus.azurecontainer.io/score")
-    print(" - HTTP method: POST")
-    print(" - Headers: Authorization: Bearer ********, Content-Type: application/json")
-    print(" - NOTE: request body/payload omitted for privacy and safety")
-
-    print("\nStep 4: Sending request to deployed endpoint (simulated)")
-    print(" - Establishing TLS connection to endpoint host...")
-    print(" - Sending POST request (payload not shown)")
-    print(" - Waiting for response...")
-
-    print("\nStep 5: Received response (simulated)")
-    print(" - HTTP status: 200 OK")
-    print(" - Response body: { 'predictions': [<omitted>], 'metrics': { 'mse': 1.4 } }")
-
-    print("\nSummary:")
-    print(" - Deployment: itsm-endpoint")
-    print(" - Region: eastus")
-    print(" - Reported metric: MSE = 1.4")
-    print(" - Payload and sensitive config values were intentionally omitted/masked.")
\ No newline at end of file
@@ -0,0 +1,159 @@
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import SGDRegressor
+from sklearn.pipeline import Pipeline
+
+STREAM_MODELS = ('sgd', 'forest')
+
+
+def validation_mask(n_rows: int, chunk_index: int, test_size: float = 0.2, seed: int = 42) -> np.ndarray:
+    """
+    Rows of a chunk held out for validation. Seeded by the chunk's position,
+    so every pass over the same file holds out the same rows.
+    """
+    return np.random.RandomState(seed + chunk_index).rand(n_rows) < test_size
+
+
+class StreamingRegressionMetrics:
+    """
+    MSE and R2 accumulated one batch of predictions at a time from running
+    sums, giving the same values as computing them over all rows at once.
+    The target sums are taken relative to its first value, which keeps them
+    accurate and makes a constant target's variance exactly zero.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.sum_squared_error = 0.0
+        self.shift = None
+        self.sum_y = 0.0
+        self.sum_y_squared = 0.0
+
+    def update(self, y_true, y_pred):
+        y_true = np.asarray(y_true, dtype=np.float64)
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        if not len(y_true):
+            return self
+        if self.shift is None:
+            self.shift = float(y_true[0])
+        self.n += len(y_true)
+        self.sum_squared_error += float(np.sum((y_true - y_pred) ** 2))
+        shifted = y_true - self.shift
+        self.sum_y += float(np.sum(shifted))
+        self.sum_y_squared += float(np.sum(shifted ** 2))
+        return self
+
+    def result(self) -> dict:
+        if not self.n:
+            return {"task": "regression", "mse": None, "r2": None}
+        total_sum_of_squares = self.sum_y_squared - self.sum_y ** 2 / self.n
+        if total_sum_of_squares > 0:
+            r2 = 1 - self.sum_squared_error / total_sum_of_squares
+        else:
+            # A constant target, scored as sklearn's r2_score does: 1.0 for perfect predictions, else 0.0
+            r2 = 1.0 if self.sum_squared_error == 0 else 0.0
+        return {
+            "task": "regression",
+            "mse": self.sum_squared_error / self.n,
+            "r2": r2,
+        }
+
+
+class StreamingTrainer:
+    """
+    Trains a regressor on a dataset read in chunks, so only one chunk is in
+    memory at a time. ``make_chunks`` is called once per pass and must yield
+    the same ``(X, y)`` chunks each time; a seeded share of every chunk is
+    held out (see validation_mask) and scored in a final pass.
+
+    'sgd' fits an SGDRegressor with partial_fit over ``epochs`` passes, behind
+    a mean imputer fitted on the first chunk. 'forest' fits a sub-forest of
+    ``trees_per_chunk`` trees on each chunk and merges them into one
+    RandomForestRegressor, whose prediction averages all of their trees.
+    """
+
+    def __init__(self, model: str = 'forest', test_size: float = 0.2, seed: int = 42, trees_per_chunk: int = 10,
+                 n_jobs: int = None, max_depth: int = None, max_samples=None, epochs: int = 1):
+        if model not in STREAM_MODELS:
+            raise ValueError(f"Unknown streaming model '{model}', expected one of {STREAM_MODELS}")
+        self.model = model
+        self.test_size = test_size
+        self.seed = seed
+        self.trees_per_chunk = trees_per_chunk
+        self.n_jobs = n_jobs
+        self.max_depth = max_depth
+        self.max_samples = max_samples
+        self.epochs = epochs
+        self.estimator_ = None
+        self.train_rows = 0
+        self.chunks = 0
+
+    def _training_chunks(self, make_chunks):
+        for chunk_index, (X, y) in enumerate(make_chunks()):
+            held_out = validation_mask(len(X), chunk_index, self.test_size, self.seed)
+            if (~held_out).any():
+                yield chunk_index, X[~held_out], y[~held_out]
+
+    def fit(self, make_chunks):
+        if self.model == 'sgd':
+            self._fit_sgd(make_chunks)
+        else:
+            self._fit_forest(make_chunks)
+        if not self.train_rows:
+            raise ValueError("No training rows in the streamed dataset")
+        return self
+
+    def _fit_sgd(self, make_chunks):
+        imputer, regressor = None, SGDRegressor(random_state=self.seed)
+        for epoch in range(self.epochs):
+            for chunk_index, X, y in self._training_chunks(make_chunks):
+                if imputer is None:
+                    # Columns with no values in the first chunk are imputed with 0, as
+                    # keep_empty_features=True would; that option needs scikit-learn >= 1.2
+                    # and the component environment ships 1.0. Either way the column count stays stable.
+                    empty_columns = X.columns[X.isna().all()]
+                    imputer = SimpleImputer(strategy='mean').fit(X.fillna({col: 0 for col in empty_columns}))
+                regressor.partial_fit(imputer.transform(X), y)
+                if epoch == 0:
+                    self.train_rows += len(X)
+                    self.chunks += 1
+            print(f"SGD epoch {epoch + 1}/{self.epochs} done")
+        self.estimator_ = Pipeline([('impute', imputer), ('model', regressor)])
+
+    def _fit_forest(self, make_chunks):
+        forest = None
+        for chunk_index, X, y in self._training_chunks(make_chunks):
+            start = time.perf_counter()
+            sub_forest = RandomForestRegressor(
+                n_estimators=self.trees_per_chunk,
+                max_depth=self.max_depth,
+                max_samples=self.max_samples,
+                n_jobs=self.n_jobs,
+                random_state=self.seed + chunk_index,
+            ).fit(X, y)
+            if forest is None:
+                forest = sub_forest
+            else:
+                forest.estimators_ += sub_forest.estimators_
+                forest.n_estimators = len(forest.estimators_)
+            self.train_rows += len(X)
+            self.chunks += 1
+            print(f"Chunk {chunk_index}: {len(X)} rows, {self.trees_per_chunk} trees "
+                  f"in {time.perf_counter() - start:.2f}s ({forest.n_estimators} in total)")
+        self.estimator_ = forest
+
+    def evaluate(self, make_chunks) -> dict:
+        """
+        Validation metrics of the fitted model over the held-out rows of every chunk.
+        """
+        metrics = StreamingRegressionMetrics()
+        for chunk_index, (X, y) in enumerate(make_chunks()):
+            held_out = validation_mask(len(X), chunk_index, self.test_size, self.seed)
+            if held_out.any():
+                metrics.update(y[held_out], self.estimator_.predict(X[held_out]))
+        result = metrics.result()
+        result["validation_rows"] = metrics.n
+        return result
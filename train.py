@@ -1,79 +1,325 @@
 import argparse
 import pandas as pd
-import joblib
 import json
 import os
+import shutil
+import time
+import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
-from simulate_real_endpoint import print_simulated_endpoint_test
+from data_io import iter_frame_chunks, read_frame
+from hyperparameter_search import SEARCH_METHODS, HyperparameterSearch, load_search_space
+from model_artifact import QUANTISE_DTYPES, artifact_report, prune_forest, quantise_leaf_values, save_artifact, write_report
+from streaming_training import STREAM_MODELS, StreamingTrainer
+
 
 # -----------------------------
 # Parse arguments
 # -----------------------------
-parser = argparse.ArgumentParser()
-parser.add_argument("--train", type=str, required=True, help="Path to preprocessed train CSV")
-parser.add_argument("--model_output", type=str, required=True, help="Folder to save trained model")
-parser.add_argument("--metrics_output", type=str, required=True, help="Folder to save metrics JSON")
-args = parser.parse_args()
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--train", type=str, required=True, help="Path to preprocessed train data (CSV, Parquet or Feather)")
+    parser.add_argument("--model_output", type=str, required=True, help="Folder to save trained model")
+    parser.add_argument("--metrics_output", type=str, required=True, help="Folder to save metrics JSON")
+    parser.add_argument("--pipeline", type=str, default=None, help="Folder holding the fitted preprocessing pipeline")
+    parser.add_argument("--n_estimators", type=int, default=100, help="Number of trees (the cap with --early_stopping)")
+    parser.add_argument("--n_jobs", type=int, default=-1, help="Cores used to fit and predict trees (-1 for all)")
+    parser.add_argument("--max_samples", type=_fraction_or_count, default=None,
+                        help="Rows bootstrapped per tree, as a fraction below 1 (e.g. 0.5) or a whole count (e.g. 1e4; default: all)")
+    parser.add_argument("--max_depth", type=int, default=None, help="Depth cap per tree (default: unlimited)")
+    parser.add_argument("--float32", action="store_true",
+                        help="Hold features as float32, the precision trees split on, halving their memory")
+    parser.add_argument("--early_stopping", action="store_true",
+                        help="Add trees in steps and stop once the out-of-bag score plateaus")
+    parser.add_argument("--trees_per_step", type=int, default=10, help="Trees added per step with --early_stopping")
+    parser.add_argument("--patience", type=int, default=2,
+                        help="Steps without an out-of-bag improvement above --tol before stopping")
+    parser.add_argument("--tol", type=float, default=1e-3, help="Smallest out-of-bag R2 gain counted as an improvement")
+    parser.add_argument("--stream_chunk_size", type=int, default=None,
+                        help="Train out of core, reading the training data in chunks of this many rows")
+    parser.add_argument("--stream_model", type=str, choices=STREAM_MODELS, default="forest",
+                        help="With --stream_chunk_size: merged per-chunk sub-forests, or an incremental SGD regressor")
+    parser.add_argument("--trees_per_chunk", type=int, default=10, help="Trees fitted on each chunk by --stream_model forest")
+    parser.add_argument("--stream_epochs", type=int, default=1, help="Passes over the data for --stream_model sgd")
+    parser.add_argument("--search", type=str, choices=SEARCH_METHODS, default=None,
+                        help="Search hyperparameters (random or successive halving) before training the final model")
+    parser.add_argument("--search_space", type=str, default=None,
+                        help="JSON file of {param: [values]} to search (default: trees, depth, max_features, min samples)")
+    parser.add_argument("--n_trials", type=int, default=20, help="Configurations sampled by the search")
+    parser.add_argument("--search_workers", type=int, default=None, help="Worker processes running trials (default: all cores)")
+    parser.add_argument("--max_trial_trees", type=int, default=200, help="Tree budget cap of every search trial")
+    parser.add_argument("--halving_factor", type=int, default=3,
+                        help="With --search halving, keep 1/factor of the configurations per round")
+    parser.add_argument("--artifact_compress", type=int, choices=range(10), default=0,
+                        help="joblib compression level of model.joblib (0 keeps it memory-mappable)")
+    parser.add_argument("--artifact_max_depth", type=int, default=None,
+                        help="Prune the trained trees back to this depth before saving")
+    parser.add_argument("--artifact_quantise", type=str, choices=QUANTISE_DTYPES, default=None,
+                        help="Round tree node values to this precision to shrink compressed artifacts. Predictions lose "
+                             "precision: float16 keeps about 3 significant digits (values up to 65504; larger ones "
+                             "fall back to float32), float32 about 7")
+    parser.add_argument("--artifact_report", action="store_true",
+                        help="Write artifact_report.json (size, load time, predict latency) next to metrics.json")
+    return parser.parse_args()
+
+
+def _fraction_or_count(value: str):
+    # Whole numbers (also written '1e3' or '500.0') are row counts, as
+    # scikit-learn reads an int max_samples; anything below 1 is a fraction
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a number")
+    if number >= 1 and number.is_integer():
+        return int(number)
+    if 0 < number < 1:
+        return number
+    raise argparse.ArgumentTypeError(f"'{value}' is neither a fraction between 0 and 1 nor a positive whole row count")
+
 
 # -----------------------------
 # Load data
 # -----------------------------
-df = pd.read_csv(args.train)
-
-# Determine target column
-if "target" in df.columns:
-    target_col = "target"
-elif "Priority" in df.columns:
-    target_col = "Priority"
-    print("Using 'Priority' column as target.")
-else:
+def target_column(columns) -> str:
+    # Determine target column
+    if "target" in columns:
+        return "target"
+    if "Priority" in columns:
+        print("Using 'Priority' column as target.")
+        return "Priority"
     raise KeyError("No target column found. Expected 'target' or 'Priority'.")
 
-X = df.drop(columns=target_col)
-y = df[target_col]
 
-# -----------------------------
-# Split data
-# -----------------------------
-X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+def split_features_target(df: pd.DataFrame, target_col: str = None):
+    target_col = target_col or target_column(df.columns)
+    X = df.drop(columns=target_col)
+    y = df[target_col]
+    return X, y
+
 
 # -----------------------------
 # Train model
 # -----------------------------
-model = RandomForestRegressor(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
+def build_model(n_estimators: int = 100, n_jobs: int = None, max_samples=None, max_depth: int = None, **params):
+    return RandomForestRegressor(
+        n_estimators=n_estimators,
+        n_jobs=n_jobs,
+        max_samples=max_samples,
+        max_depth=max_depth,
+        random_state=42,
+        **params
+    )
+
+
+def fit_with_early_stopping(model, X_train, y_train, trees_per_step: int = 10, patience: int = 2,
+                            tol: float = 1e-3):
+    """
+    Grow the forest ``trees_per_step`` trees at a time (warm start), up to the
+    model's ``n_estimators``, until the out-of-bag R2 has not improved by more
+    than ``tol`` for ``patience`` steps. Returns the out-of-bag score history.
+    """
+    max_estimators = model.n_estimators
+    model.set_params(warm_start=True, oob_score=True)
+
+    history = []
+    best_score, steps_without_improvement = -np.inf, 0
+    for n_estimators in range(trees_per_step, max_estimators + trees_per_step, trees_per_step):
+        model.set_params(n_estimators=min(n_estimators, max_estimators))
+        model.fit(X_train, y_train)
+        history.append({"n_estimators": model.n_estimators, "oob_r2": float(model.oob_score_)})
+        print(f"{model.n_estimators} trees: out-of-bag R2 {model.oob_score_:.4f}")
+
+        if model.oob_score_ > best_score + tol:
+            best_score, steps_without_improvement = model.oob_score_, 0
+        else:
+            steps_without_improvement += 1
+        if steps_without_improvement >= patience and model.n_estimators < max_estimators:
+            print(f"Out-of-bag score plateaued; stopping at {model.n_estimators} trees.")
+            break
+
+    model.set_params(warm_start=False)
+    return history
+
 
 # -----------------------------
 # Evaluate
 # -----------------------------
-preds = model.predict(X_val)
-mse = float(mean_squared_error(y_val, preds))
-r2 = float(r2_score(y_val, preds))
+def evaluate_model(model, X_val, y_val) -> dict:
+    preds = model.predict(X_val)
+    mse = float(mean_squared_error(y_val, preds))
+    r2 = float(r2_score(y_val, preds))
 
-metrics = {
-    "task": "regression",
-    "mse": mse,
-    "r2": r2
-}
+    return {
+        "task": "regression",
+        "mse": mse,
+        "r2": r2
+    }
 
-print(f"Evaluation metrics: {metrics}")
 
-# -----------------------------
-# Save model
-# -----------------------------
-os.makedirs(args.model_output, exist_ok=True)
-joblib.dump(model, os.path.join(args.model_output, "model.joblib"))
-print(f"Model saved to {args.model_output}")
+def compact_model(model, args):
+    """
+    Prune and/or quantise a forest as requested, before it is evaluated, so
+    the metrics describe what is deployed.
+    """
+    if not hasattr(model, "estimators_"):
+        return model
+    if args.artifact_max_depth is not None:
+        prune_forest(model, args.artifact_max_depth)
+        print(f"Pruned trees to depth {args.artifact_max_depth}")
+    if args.artifact_quantise:
+        dtype = quantise_leaf_values(model, args.artifact_quantise)
+        if dtype:
+            print(f"Quantised tree values to {dtype}")
+    return model
 
-# -----------------------------
-# Save metrics
-# -----------------------------
-os.makedirs(args.metrics_output, exist_ok=True)
-with open(os.path.join(args.metrics_output, "metrics.json"), "w") as f:
-    json.dump(metrics, f)
-print(f"Metrics saved to {args.metrics_output}")
+
+def train_in_memory(args):
+    """
+    Train on the whole dataset with an 80/20 split; returns the model, its
+    metrics and a sample of validation features.
+    """
+    df = read_frame(args.train)
+    X, y = split_features_target(df)
+    del df
+    if args.float32:
+        # Trees split on float32 anyway, so this saves memory (and a conversion per fit) without changing results
+        X = X.astype(np.float32)
+
+    # Split data
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+    del X, y
+
+    model_params = {
+        "n_estimators": args.n_estimators,
+        "max_samples": args.max_samples,
+        "max_depth": args.max_depth,
+    }
+    search = None
+    if args.search:
+        search = HyperparameterSearch(
+            space=load_search_space(args.search_space),
+            method=args.search,
+            n_trials=args.n_trials,
+            n_workers=args.search_workers,
+            factor=args.halving_factor,
+            max_trial_trees=args.max_trial_trees,
+        )
+        start = time.perf_counter()
+        model_params.update(search.run(X_train, y_train, X_val, y_val))
+        print(f"Search finished in {time.perf_counter() - start:.2f}s; best parameters: {search.best_params}")
+        os.makedirs(args.metrics_output, exist_ok=True)
+        search.save_leaderboard(os.path.join(args.metrics_output, "leaderboard.json"))
+        print(f"Search leaderboard saved to {args.metrics_output}")
+
+    model = build_model(n_jobs=args.n_jobs, **model_params)
+    start = time.perf_counter()
+    oob_history = None
+    if args.early_stopping:
+        oob_history = fit_with_early_stopping(model, X_train, y_train, trees_per_step=args.trees_per_step,
+                                              patience=args.patience, tol=args.tol)
+    else:
+        model.fit(X_train, y_train)
+    train_seconds = time.perf_counter() - start
+    print(f"Trained {model.n_estimators} trees in {train_seconds:.2f}s")
+
+    compact_model(model, args)
+
+    metrics = evaluate_model(model, X_val, y_val)
+    print(f"Evaluation metrics: {metrics}")
+    metrics["n_estimators"] = model.n_estimators
+    metrics["train_seconds"] = round(train_seconds, 3)
+    if oob_history is not None:
+        metrics["oob_history"] = oob_history
+    if search is not None:
+        metrics["best_params"] = search.best_params
+    return model, metrics, X_val
+
+
+def train_streaming(args):
+    """
+    Train out of core, one chunk of the training file at a time, holding out
+    a seeded 20% of every chunk for validation; returns the same as
+    train_in_memory.
+    """
+    target_col = target_column(next(iter_frame_chunks(args.train, 1)).columns)
+    dtype = np.float32 if args.float32 else None
+
+    def make_chunks():
+        for chunk in iter_frame_chunks(args.train, args.stream_chunk_size):
+            X, y = split_features_target(chunk, target_col)
+            yield (X.astype(dtype) if dtype else X), y
+
+    trainer = StreamingTrainer(
+        model=args.stream_model,
+        trees_per_chunk=args.trees_per_chunk,
+        n_jobs=args.n_jobs,
+        max_depth=args.max_depth,
+        max_samples=args.max_samples,
+        epochs=args.stream_epochs,
+    )
+    start = time.perf_counter()
+    model = trainer.fit(make_chunks).estimator_
+    train_seconds = time.perf_counter() - start
+    print(f"Trained on {trainer.train_rows} rows in {trainer.chunks} chunks in {train_seconds:.2f}s")
+
+    compact_model(model, args)
+    trainer.estimator_ = model
+
+    metrics = trainer.evaluate(make_chunks)
+    print(f"Evaluation metrics: {metrics}")
+    metrics["train_rows"] = trainer.train_rows
+    metrics["train_seconds"] = round(train_seconds, 3)
+    if hasattr(model, "estimators_"):
+        metrics["n_estimators"] = len(model.estimators_)
+
+    X_sample, _ = next(make_chunks())
+    return model, metrics, X_sample.iloc[:1000]
+
+
+def main():
+    args = parse_arguments()
+
+    if args.stream_chunk_size:
+        model, metrics, X_sample = train_streaming(args)
+    else:
+        model, metrics, X_sample = train_in_memory(args)
+
+    # -----------------------------
+    # Save model
+    # -----------------------------
+    os.makedirs(args.model_output, exist_ok=True)
+    model_path = os.path.join(args.model_output, "model.joblib")
+    save_artifact(model, model_path, compress=args.artifact_compress)
+    print(f"Model saved to {args.model_output}")
+
+    # Ship the fitted preprocessing pipeline next to the model
+    if args.pipeline:
+        # Azure ML mounts the input as a folder (which may hold subfolders) or hands over a single file
+        if os.path.isdir(args.pipeline):
+            shutil.copytree(args.pipeline, args.model_output, dirs_exist_ok=True)
+        else:
+            shutil.copy2(args.pipeline, args.model_output)
+        print(f"Preprocessing pipeline copied to {args.model_output}")
+
+    # -----------------------------
+    # Save metrics
+    # -----------------------------
+    os.makedirs(args.metrics_output, exist_ok=True)
+    with open(os.path.join(args.metrics_output, "metrics.json"), "w") as f:
+        json.dump(metrics, f)
+    print(f"Metrics saved to {args.metrics_output}")
+
+    if args.artifact_report:
+        report = artifact_report(model_path, X_sample, mmap=args.artifact_compress == 0)
+        report.update({
+            "compress": args.artifact_compress,
+            "pruned_max_depth": args.artifact_max_depth,
+            "quantise": args.artifact_quantise,
+        })
+        print(f"Artifact report: {report}")
+        write_report(report, os.path.join(args.metrics_output, "artifact_report.json"))
 
 
-print_simulated_endpoint_test()
\ No newline at end of file
+if __name__ == "__main__":
+    main()